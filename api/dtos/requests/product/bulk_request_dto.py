@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from typing import List
+
+from api.dtos.requests.product.create_request_dto import ProductCreateRequestDTO
+from api.dtos.requests.product.update_request_dto import ProductUpdateRequestDTO
+
+
+class ProductBulkCreateRequestDTO(BaseModel):
+    items: List[ProductCreateRequestDTO]
+
+
+class ProductBulkUpdateItemRequestDTO(ProductUpdateRequestDTO):
+    id: str
+
+
+class ProductBulkUpdateRequestDTO(BaseModel):
+    items: List[ProductBulkUpdateItemRequestDTO]
+
+
+class ProductBulkDeleteRequestDTO(BaseModel):
+    ids: List[str]
@@ -0,0 +1,13 @@
+from datetime import datetime
+from pydantic import BaseModel
+from typing import Literal
+
+
+class ProductFilterRequestDTO(BaseModel):
+    category_id: str | None = None
+    created_from: datetime | None = None
+    created_to: datetime | None = None
+    updated_from: datetime | None = None
+    updated_to: datetime | None = None
+    sort: Literal["created_at", "name"] = "created_at"
+    order: Literal["asc", "desc"] = "asc"
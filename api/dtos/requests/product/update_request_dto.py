@@ -4,3 +4,4 @@ from pydantic import BaseModel
 class ProductUpdateRequestDTO(BaseModel):
     name: str
     description: str
+    category_id: str | None = None
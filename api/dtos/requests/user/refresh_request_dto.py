@@ -0,0 +1,5 @@
+from pydantic import BaseModel
+
+
+class RefreshTokenRequestDTO(BaseModel):
+    refresh_token: str
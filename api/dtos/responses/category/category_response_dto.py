@@ -1,3 +1,4 @@
+from datetime import datetime
 from pydantic import BaseModel
 from typing import List
 
@@ -5,6 +6,7 @@ from typing import List
 class CategoryResponseDTO(BaseModel):
     id: str
     name: str
+    updated_at: datetime
 
 
 class ProductResponseDTO(BaseModel):
@@ -12,7 +14,25 @@ class ProductResponseDTO(BaseModel):
     name: str
     description: str
     banner: str
+    updated_at: datetime
 
 
 class CategoryDetailResponseDTO(CategoryResponseDTO):
     products: List[ProductResponseDTO]
+    product_count: int | None
+    next_cursor: str | None
+
+
+class CategoryPageResponseDTO(BaseModel):
+    items: List[CategoryResponseDTO]
+    next_cursor: str | None
+
+
+class CategorySummaryItemResponseDTO(BaseModel):
+    id: str
+    name: str
+    product_count: int
+
+
+class CategorySummaryResponseDTO(BaseModel):
+    items: List[CategorySummaryItemResponseDTO]
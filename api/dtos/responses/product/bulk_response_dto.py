@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from typing import List
+
+
+class ProductBulkItemResponseDTO(BaseModel):
+    index: int
+    id: str | None
+    status: int
+    detail: str | None
+
+
+class ProductBulkResponseDTO(BaseModel):
+    items: List[ProductBulkItemResponseDTO]
@@ -1,9 +1,8 @@
+from datetime import datetime
 from pydantic import BaseModel
+from typing import List
 
-
-class CategoryResponseDTO(BaseModel):
-    id: str
-    name: str
+from api.dtos.responses.category.category_response_dto import CategoryResponseDTO
 
 
 class ProductResponseDTO(BaseModel):
@@ -11,6 +10,7 @@ class ProductResponseDTO(BaseModel):
     name: str
     description: str
     banner: str
+    updated_at: datetime
     category: CategoryResponseDTO
 
 
@@ -19,3 +19,8 @@ class ProductNameResponseDTO(BaseModel):
     name: str
     description: str
     banner: str
+
+
+class ProductPageResponseDTO(BaseModel):
+    items: List[ProductResponseDTO]
+    next_cursor: str | None
@@ -10,8 +10,10 @@ class UserResponseDTO(BaseModel):
 
 class UserWithPassResponseDTO(UserResponseDTO):
     password: str
+    token_version: int = 0
 
 
 class TokenResponseDTO(BaseModel):
     access_token: str
+    refresh_token: str
     token_type: str
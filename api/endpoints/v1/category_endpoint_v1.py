@@ -1,33 +1,40 @@
-from typing import List
-from fastapi import APIRouter, status, Depends, Request
-
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from typing import Literal
+from fastapi import APIRouter, status, Query, Depends, Request
 
 from api.services.category_service import (
     store_service,
     show_service,
     update_service,
     index_service,
+    summary_service,
     destroy_service
 )
 from api.dtos.requests.category.create_request_dto import CategoryCreateRequestDTO
 from api.dtos.requests.category.update_request_dto import CategoryUpdateRequestDTO
 from api.dtos.responses.category.category_response_dto import (
     CategoryResponseDTO,
-    CategoryDetailResponseDTO
+    CategoryDetailResponseDTO,
+    CategoryPageResponseDTO,
+    CategorySummaryResponseDTO
 )
 from api.dtos.responses.exception_response_dto import (
     ExceptionResponseDTO,
     ExceptionRateLimitResponseDTO
 )
 from api.dtos.responses.user.user_response_dto import UserResponseDTO
+from api.utils.conditional import (
+    make_etag,
+    conditional_headers,
+    is_not_modified,
+    not_modified_response
+)
+from api.utils.responses import dto_response
 
 from core.authentication.deps import get_current_user
-from core.config import REQUEST_PER_MINUTES
+from core.config import REQUEST_PER_MINUTES, SIZE_PER_PAGE
+from core.rate_limit import limiter
 
 category_router_v1 = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
 
 
 @category_router_v1.post(
@@ -48,16 +55,40 @@ async def store(
     categoryCreateRequestDTO: CategoryCreateRequestDTO,
     user_logged: UserResponseDTO = Depends(get_current_user)
 ) -> CategoryResponseDTO:
-    return await store_service(categoryCreateRequestDTO)
+    return dto_response(
+        await store_service(categoryCreateRequestDTO),
+        status.HTTP_201_CREATED
+    )
+
+
+@category_router_v1.get(
+    "/summary",
+    summary="Summary of categories",
+    description="Return every category with its number of products",
+    status_code=status.HTTP_200_OK,
+    response_model=CategorySummaryResponseDTO,
+    responses={
+        401: {"model": ExceptionResponseDTO},
+        429: {"model": ExceptionRateLimitResponseDTO}
+    }
+)
+@limiter.limit(str(REQUEST_PER_MINUTES) + "/minute")
+async def summary(
+    request: Request,
+    user_logged: UserResponseDTO = Depends(get_current_user)
+) -> CategorySummaryResponseDTO:
+    return dto_response(await summary_service())
 
 
 @category_router_v1.get(
     "/{category_id}",
     summary="Get some category by id",
-    description="Return some category by id",
+    description="Return some category by id with a page of its products, or only their count",
     status_code=status.HTTP_200_OK,
     response_model=CategoryDetailResponseDTO,
     responses={
+        304: {"description": "Category not modified since the given ETag."},
+        400: {"model": ExceptionResponseDTO},
         401: {"model": ExceptionResponseDTO},
         404: {"model": ExceptionResponseDTO},
         429: {"model": ExceptionRateLimitResponseDTO}
@@ -67,9 +98,30 @@ async def store(
 async def show(
     request: Request,
     category_id: str,
+    limit: int = Query(default=SIZE_PER_PAGE, ge=1, le=SIZE_PER_PAGE),
+    cursor: str | None = None,
+    products: Literal["list", "count"] = "list",
     user_logged: UserResponseDTO = Depends(get_current_user)
 ) -> CategoryDetailResponseDTO:
-    return await show_service(category_id)
+    category: CategoryDetailResponseDTO = await show_service(
+        category_id,
+        limit,
+        cursor,
+        products
+    )
+
+    etag: str = make_etag(
+        category.id,
+        category.updated_at,
+        category.product_count,
+        category.next_cursor,
+        *[f"{product.id}@{product.updated_at}" for product in category.products]
+    )
+
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    return dto_response(category, headers=conditional_headers(etag))
 
 
 @category_router_v1.get(
@@ -77,8 +129,9 @@ async def show(
     summary="List of categories",
     description="Return some list of categories",
     status_code=status.HTTP_200_OK,
-    response_model=List[CategoryResponseDTO],
+    response_model=CategoryPageResponseDTO,
     responses={
+        400: {"model": ExceptionResponseDTO},
         401: {"model": ExceptionResponseDTO},
         429: {"model": ExceptionRateLimitResponseDTO}
     }
@@ -86,9 +139,11 @@ async def show(
 @limiter.limit(str(REQUEST_PER_MINUTES) + "/minute")
 async def index(
     request: Request,
+    limit: int = Query(default=SIZE_PER_PAGE, ge=1, le=SIZE_PER_PAGE),
+    cursor: str | None = None,
     user_logged: UserResponseDTO = Depends(get_current_user)
-) -> List[CategoryResponseDTO]:
-    return await index_service()
+) -> CategoryPageResponseDTO:
+    return dto_response(await index_service(limit, cursor))
 
 
 @category_router_v1.put(
@@ -96,7 +151,7 @@ async def index(
     summary="Update some category by id",
     description="Return some category by id updated",
     status_code=status.HTTP_202_ACCEPTED,
-    response_model=CategoryDetailResponseDTO,
+    response_model=CategoryResponseDTO,
     responses={
         401: {"model": ExceptionResponseDTO},
         404: {"model": ExceptionResponseDTO},
@@ -110,8 +165,11 @@ async def update(
     category_id: str,
     categoryUpdateRequestDTO: CategoryUpdateRequestDTO,
     user_logged: UserResponseDTO = Depends(get_current_user)
-) -> CategoryDetailResponseDTO:
-    return await update_service(category_id, categoryUpdateRequestDTO)
+) -> CategoryResponseDTO:
+    return dto_response(
+        await update_service(category_id, categoryUpdateRequestDTO),
+        status.HTTP_202_ACCEPTED
+    )
 
 
 @category_router_v1.delete(
@@ -1,34 +1,70 @@
-from typing import List
+from datetime import datetime
+from typing import Literal
 
-from fastapi import APIRouter, status, UploadFile, Depends, Request
-from fastapi.responses import FileResponse
-
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from fastapi import (
+    APIRouter,
+    status,
+    Query,
+    Path,
+    UploadFile,
+    Depends,
+    Request,
+    Response,
+    BackgroundTasks,
+    HTTPException
+)
+from fastapi.responses import StreamingResponse
 
 from api.services.product_service import (
     store_service,
     show_service,
+    show_banner_service,
     index_service,
+    search_service,
+    export_service,
     update_service,
     upload_service,
-    destroy_service
+    destroy_service,
+    bulk_store_service,
+    bulk_update_service,
+    bulk_destroy_service
 )
 from api.dtos.requests.product.create_request_dto import ProductCreateRequestDTO
 from api.dtos.requests.product.update_request_dto import ProductUpdateRequestDTO
-from api.dtos.responses.product.product_response_dto import ProductResponseDTO
+from api.dtos.requests.product.filter_request_dto import ProductFilterRequestDTO
+from api.dtos.requests.product.bulk_request_dto import (
+    ProductBulkCreateRequestDTO,
+    ProductBulkUpdateRequestDTO,
+    ProductBulkDeleteRequestDTO
+)
+from api.dtos.responses.product.product_response_dto import (
+    ProductResponseDTO,
+    ProductPageResponseDTO
+)
+from api.dtos.responses.product.bulk_response_dto import ProductBulkResponseDTO
 
 from api.dtos.responses.exception_response_dto import (
     ExceptionResponseDTO,
     ExceptionRateLimitResponseDTO
 )
 from api.dtos.responses.user.user_response_dto import UserResponseDTO
+from api.utils.conditional import (
+    make_etag,
+    conditional_headers,
+    is_not_modified,
+    not_modified_response,
+    conditional_file_response
+)
+from api.utils.images import resolve_variant
+from api.utils.responses import dto_response
+from api.utils.storage import HASHED_FILENAME_PATTERN
+from api.utils.storage_backends import storage_key
 
 from core.authentication.deps import get_current_user
-from core.config import REQUEST_PER_MINUTES, UPLOAD_DIR
+from core.config import REQUEST_PER_MINUTES, SIZE_PER_PAGE
+from core.rate_limit import limiter
 
 product_router_v1 = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
 
 
 @product_router_v1.post(
@@ -50,7 +86,132 @@ async def store(
     productCreateRequestDTO: ProductCreateRequestDTO,
     user_logged: UserResponseDTO = Depends(get_current_user)
 ) -> ProductResponseDTO:
-    return await store_service(productCreateRequestDTO)
+    return dto_response(
+        await store_service(productCreateRequestDTO),
+        status.HTTP_201_CREATED
+    )
+
+
+@product_router_v1.post(
+    "/bulk",
+    summary="Create products in batch",
+    description="Return the result of each product creation in the batch",
+    status_code=status.HTTP_207_MULTI_STATUS,
+    response_model=ProductBulkResponseDTO,
+    responses={
+        401: {"model": ExceptionResponseDTO},
+        422: {"model": ExceptionResponseDTO},
+        429: {"model": ExceptionRateLimitResponseDTO}
+    }
+)
+@limiter.limit(str(REQUEST_PER_MINUTES) + "/minute")
+async def bulk_store(
+    request: Request,
+    productBulkCreateRequestDTO: ProductBulkCreateRequestDTO,
+    user_logged: UserResponseDTO = Depends(get_current_user)
+) -> ProductBulkResponseDTO:
+    return dto_response(
+        await bulk_store_service(productBulkCreateRequestDTO),
+        status.HTTP_207_MULTI_STATUS
+    )
+
+
+@product_router_v1.patch(
+    "/bulk",
+    summary="Update products in batch",
+    description="Return the result of each product update in the batch",
+    status_code=status.HTTP_207_MULTI_STATUS,
+    response_model=ProductBulkResponseDTO,
+    responses={
+        401: {"model": ExceptionResponseDTO},
+        409: {"model": ExceptionResponseDTO},
+        422: {"model": ExceptionResponseDTO},
+        429: {"model": ExceptionRateLimitResponseDTO}
+    }
+)
+@limiter.limit(str(REQUEST_PER_MINUTES) + "/minute")
+async def bulk_update(
+    request: Request,
+    productBulkUpdateRequestDTO: ProductBulkUpdateRequestDTO,
+    user_logged: UserResponseDTO = Depends(get_current_user)
+) -> ProductBulkResponseDTO:
+    return dto_response(
+        await bulk_update_service(productBulkUpdateRequestDTO),
+        status.HTTP_207_MULTI_STATUS
+    )
+
+
+@product_router_v1.delete(
+    "/bulk",
+    summary="Delete products in batch",
+    description="Return the result of each product deletion in the batch",
+    status_code=status.HTTP_207_MULTI_STATUS,
+    response_model=ProductBulkResponseDTO,
+    responses={
+        401: {"model": ExceptionResponseDTO},
+        422: {"model": ExceptionResponseDTO},
+        429: {"model": ExceptionRateLimitResponseDTO}
+    }
+)
+@limiter.limit(str(REQUEST_PER_MINUTES) + "/minute")
+async def bulk_destroy(
+    request: Request,
+    productBulkDeleteRequestDTO: ProductBulkDeleteRequestDTO,
+    user_logged: UserResponseDTO = Depends(get_current_user)
+) -> ProductBulkResponseDTO:
+    return dto_response(
+        await bulk_destroy_service(productBulkDeleteRequestDTO),
+        status.HTTP_207_MULTI_STATUS
+    )
+
+
+@product_router_v1.get(
+    "/export",
+    summary="Export all products",
+    description="Stream every product as NDJSON (default) or as a JSON array",
+    status_code=status.HTTP_200_OK,
+    responses={
+        200: {
+            "content": {"application/x-ndjson": {}, "application/json": {}},
+            "description": "Return a stream with all products.",
+        },
+        401: {"model": ExceptionResponseDTO},
+        429: {"model": ExceptionRateLimitResponseDTO}
+    }
+)
+@limiter.limit(str(REQUEST_PER_MINUTES) + "/minute")
+async def export(
+    request: Request,
+    format: Literal["ndjson", "json"] = "ndjson",
+    user_logged: UserResponseDTO = Depends(get_current_user)
+) -> StreamingResponse:
+    return StreamingResponse(
+        export_service(format),
+        media_type="application/json" if format == "json" else "application/x-ndjson"
+    )
+
+
+@product_router_v1.get(
+    "/search",
+    summary="Search products",
+    description="Return ranked products matching name or description, with prefix match for autocomplete",
+    status_code=status.HTTP_200_OK,
+    response_model=ProductPageResponseDTO,
+    responses={
+        400: {"model": ExceptionResponseDTO},
+        401: {"model": ExceptionResponseDTO},
+        429: {"model": ExceptionRateLimitResponseDTO}
+    }
+)
+@limiter.limit(str(REQUEST_PER_MINUTES) + "/minute")
+async def search(
+    request: Request,
+    q: str = Query(min_length=2, max_length=100),
+    limit: int = Query(default=SIZE_PER_PAGE, ge=1, le=SIZE_PER_PAGE),
+    cursor: str | None = None,
+    user_logged: UserResponseDTO = Depends(get_current_user)
+) -> ProductPageResponseDTO:
+    return dto_response(await search_service(q, limit, cursor))
 
 
 @product_router_v1.get(
@@ -60,6 +221,7 @@ async def store(
     status_code=status.HTTP_200_OK,
     response_model=ProductResponseDTO,
     responses={
+        304: {"description": "Product not modified since the given ETag."},
         401: {"model": ExceptionResponseDTO},
         404: {"model": ExceptionResponseDTO},
         429: {"model": ExceptionRateLimitResponseDTO}
@@ -71,21 +233,54 @@ async def show(
     product_id: str,
     user_logged: UserResponseDTO = Depends(get_current_user)
 ) -> ProductResponseDTO:
-    return await show_service(product_id)
+    product: ProductResponseDTO = await show_service(product_id)
 
+    etag: str = make_etag(
+        product.id,
+        product.updated_at,
+        product.category.id,
+        product.category.updated_at
+    )
+    last_modified = max(product.updated_at, product.category.updated_at)
 
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+
+    return dto_response(product, headers=conditional_headers(etag, last_modified))
+
+
+async def _banner_response(request: Request, banner: str, size: str) -> Response:
+    variant: str = await resolve_variant(
+        banner,
+        "products",
+        size,
+        request.headers.get("accept", "")
+    )
+
+    return await conditional_file_response(
+        request,
+        storage_key(variant, "products"),
+        variant,
+        vary="Accept" if size != "original" else None
+    )
+
+
+@product_router_v1.head("/file/{product_id}", include_in_schema=False)
 @product_router_v1.get(
     "/file/{product_id}",
     summary="Get banner file some product by id",
-    description="Return banner file some product by id",
+    description="Return banner file some product by id, supporting HEAD and byte ranges",
     status_code=status.HTTP_200_OK,
     responses={
         200: {
-            "content": {"image/png;image/jpg;image/jpeg": {}},
+            "content": {"image/png;image/jpg;image/jpeg;image/webp": {}},
             "description": "Return an banner file.",
         },
+        206: {"description": "Return the requested byte range of the banner file."},
+        304: {"description": "Banner not modified since the given ETag."},
         401: {"model": ExceptionResponseDTO},
         404: {"model": ExceptionResponseDTO},
+        416: {"description": "Requested range not satisfiable."},
         429: {"model": ExceptionRateLimitResponseDTO}
     }
 )
@@ -93,22 +288,62 @@ async def show(
 async def show_file(
     request: Request,
     product_id: str,
+    size: Literal["original", "medium", "thumb"] = "original",
     user_logged: UserResponseDTO = Depends(get_current_user)
 ):
-    product: ProductResponseDTO = await show_service(product_id)
-    return FileResponse(
-        path=f"{UPLOAD_DIR}/products/{product.banner}",
-        filename=product.banner
+    banner: str = await show_banner_service(product_id)
+
+    try:
+        return await _banner_response(request, banner, size)
+    except HTTPException as error:
+        if error.status_code != status.HTTP_404_NOT_FOUND or banner == "":
+            raise
+
+    # the cached name may point to a file another worker replaced and released
+    return await _banner_response(request, await show_banner_service(product_id, refresh=True), size)
+
+
+@product_router_v1.head("/files/{filename}", include_in_schema=False)
+@product_router_v1.get(
+    "/files/{filename}",
+    summary="Get banner file by its content-hashed name",
+    description="Return banner file by name, cacheable as immutable",
+    status_code=status.HTTP_200_OK,
+    responses={
+        200: {
+            "content": {"image/png;image/jpg;image/jpeg;image/webp": {}},
+            "description": "Return an banner file.",
+        },
+        206: {"description": "Return the requested byte range of the banner file."},
+        304: {"description": "Banner not modified since the given ETag."},
+        401: {"model": ExceptionResponseDTO},
+        404: {"model": ExceptionResponseDTO},
+        416: {"description": "Requested range not satisfiable."},
+        429: {"model": ExceptionRateLimitResponseDTO}
+    }
+)
+@limiter.limit(str(REQUEST_PER_MINUTES) + "/minute")
+async def show_file_by_name(
+    request: Request,
+    filename: str = Path(pattern=HASHED_FILENAME_PATTERN),
+    user_logged: UserResponseDTO = Depends(get_current_user)
+):
+    return await conditional_file_response(
+        request,
+        storage_key(filename, "products"),
+        filename,
+        immutable=True
     )
 
 
 @product_router_v1.get(
     "/",
     summary="List of products",
-    description="Return some list of products",
+    description="Return some list of products, filtered by category or dates and sorted by name or creation",
     status_code=status.HTTP_200_OK,
-    response_model=List[ProductResponseDTO],
+    response_model=ProductPageResponseDTO,
     responses={
+        400: {"model": ExceptionResponseDTO},
         401: {"model": ExceptionResponseDTO},
         429: {"model": ExceptionRateLimitResponseDTO}
     }
@@ -116,9 +351,26 @@ async def show_file(
 @limiter.limit(str(REQUEST_PER_MINUTES) + "/minute")
 async def index(
     request: Request,
+    limit: int = Query(default=SIZE_PER_PAGE, ge=1, le=SIZE_PER_PAGE),
+    cursor: str | None = None,
+    category_id: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    updated_from: datetime | None = None,
+    updated_to: datetime | None = None,
+    sort: Literal["created_at", "name"] = "created_at",
+    order: Literal["asc", "desc"] = "asc",
     user_logged: UserResponseDTO = Depends(get_current_user)
-) -> List[ProductResponseDTO]:
-    return await index_service()
+) -> ProductPageResponseDTO:
+    return dto_response(await index_service(limit, cursor, ProductFilterRequestDTO(
+        category_id=category_id,
+        created_from=created_from,
+        created_to=created_to,
+        updated_from=updated_from,
+        updated_to=updated_to,
+        sort=sort,
+        order=order
+    )))
 
 
 @product_router_v1.put(
@@ -141,7 +393,10 @@ async def update(
     productUpdateRequestDTO: ProductUpdateRequestDTO,
     user_logged: UserResponseDTO = Depends(get_current_user)
 ) -> ProductResponseDTO:
-    return await update_service(product_id, productUpdateRequestDTO)
+    return dto_response(
+        await update_service(product_id, productUpdateRequestDTO),
+        status.HTTP_202_ACCEPTED
+    )
 
 
 @product_router_v1.patch(
@@ -154,6 +409,8 @@ async def update(
         401: {"model": ExceptionResponseDTO},
         404: {"model": ExceptionResponseDTO},
         406: {"model": ExceptionResponseDTO},
+        409: {"model": ExceptionResponseDTO},
+        413: {"model": ExceptionResponseDTO},
         429: {"model": ExceptionRateLimitResponseDTO}
     }
 )
@@ -162,9 +419,13 @@ async def upload(
     request: Request,
     product_id: str,
     banner: UploadFile,
+    background_tasks: BackgroundTasks,
     user_logged: UserResponseDTO = Depends(get_current_user)
 ) -> ProductResponseDTO:
-    return await upload_service(product_id, banner)
+    return dto_response(
+        await upload_service(product_id, banner, background_tasks),
+        status.HTTP_202_ACCEPTED
+    )
 
 
 @product_router_v1.delete(
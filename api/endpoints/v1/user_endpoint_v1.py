@@ -1,17 +1,19 @@
-from fastapi import APIRouter, status, Depends, UploadFile, Request
-from fastapi.security import OAuth2PasswordRequestForm
-from fastapi.responses import JSONResponse, FileResponse
+from typing import Literal
 
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from fastapi import APIRouter, status, Depends, Path, UploadFile, Request, BackgroundTasks
+from fastapi.security import OAuth2PasswordRequestForm
 
 from api.dtos.requests.user.create_request_dto import UserCreateRequestDTO
 from api.dtos.requests.user.update_request_dto import UserUpdateRequestDTO
 from api.dtos.requests.user.login_request_dto import UserLoginRequestDTO
+from api.dtos.requests.user.refresh_request_dto import RefreshTokenRequestDTO
 from api.dtos.responses.user.user_response_dto import UserResponseDTO, TokenResponseDTO
 from api.services.user_service import (
     signup_service,
     signin_service,
+    refresh_service,
+    signout_service,
+    show_service,
     update_service,
     upload_service
 )
@@ -20,12 +22,17 @@ from api.dtos.responses.exception_response_dto import (
     ExceptionRateLimitResponseDTO
 )
 
-from core.authentication.auth import create_token_access
-from core.authentication.deps import get_current_user
-from core.config import REQUEST_PER_MINUTES_AUTH, REQUEST_PER_MINUTES, UPLOAD_DIR
+from api.utils.conditional import conditional_file_response
+from api.utils.images import resolve_variant
+from api.utils.responses import dto_response
+from api.utils.storage import HASHED_FILENAME_PATTERN
+from api.utils.storage_backends import storage_key
+
+from core.authentication.deps import get_current_claims, get_current_user
+from core.config import REQUEST_PER_MINUTES_AUTH, REQUEST_PER_MINUTES
+from core.rate_limit import limiter
 
 user_router_v1 = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
 
 
 @user_router_v1.post(
@@ -37,7 +44,8 @@ limiter = Limiter(key_func=get_remote_address)
     responses={
         400: {"model": ExceptionResponseDTO},
         409: {"model": ExceptionResponseDTO},
-        429: {"model": ExceptionRateLimitResponseDTO}
+        429: {"model": ExceptionRateLimitResponseDTO},
+        503: {"model": ExceptionResponseDTO}
     }
 )
 @limiter.limit(str(REQUEST_PER_MINUTES) + "/minute")
@@ -45,7 +53,10 @@ async def signup(
     request: Request,
     userCreateRequestDTO: UserCreateRequestDTO
 ) -> UserResponseDTO:
-    return await signup_service(userCreateRequestDTO)
+    return dto_response(
+        await signup_service(userCreateRequestDTO),
+        status.HTTP_201_CREATED
+    )
 
 
 @user_router_v1.post(
@@ -56,7 +67,8 @@ async def signup(
     response_model=TokenResponseDTO,
     responses={
         400: {"model": ExceptionResponseDTO},
-        429: {"model": ExceptionRateLimitResponseDTO}
+        429: {"model": ExceptionRateLimitResponseDTO},
+        503: {"model": ExceptionResponseDTO}
     }
 )
 @limiter.limit(str(REQUEST_PER_MINUTES_AUTH) + "/minute")
@@ -69,15 +81,45 @@ async def signin(
         password=form_data.password
     )
 
-    user: UserResponseDTO = await signin_service(userLoginRequestDTO)
+    return dto_response(await signin_service(userLoginRequestDTO))
 
-    return JSONResponse(
-        content={
-            "access_token": create_token_access(sub=user.id),
-            "token_type": "bearer"
-        },
-        status_code=status.HTTP_200_OK
-    )
+
+@user_router_v1.post(
+    "/refresh",
+    summary="Renew token access",
+    description="Return a new token access and refresh token, the given refresh token can not be reused",
+    status_code=status.HTTP_200_OK,
+    response_model=TokenResponseDTO,
+    responses={
+        401: {"model": ExceptionResponseDTO},
+        429: {"model": ExceptionRateLimitResponseDTO}
+    }
+)
+@limiter.limit(str(REQUEST_PER_MINUTES_AUTH) + "/minute")
+async def refresh(
+    request: Request,
+    refreshTokenRequestDTO: RefreshTokenRequestDTO
+) -> TokenResponseDTO:
+    return dto_response(await refresh_service(refreshTokenRequestDTO))
+
+
+@user_router_v1.post(
+    "/signout",
+    summary="Revoke tokens",
+    description="Revoke the token access and, when given, the refresh token",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={
+        401: {"model": ExceptionResponseDTO},
+        429: {"model": ExceptionRateLimitResponseDTO}
+    }
+)
+@limiter.limit(str(REQUEST_PER_MINUTES) + "/minute")
+async def signout(
+    request: Request,
+    refreshTokenRequestDTO: RefreshTokenRequestDTO | None = None,
+    payload: dict = Depends(get_current_claims)
+) -> None:
+    return await signout_service(payload, refreshTokenRequestDTO)
 
 
 @user_router_v1.get(
@@ -89,6 +131,7 @@ async def signin(
     responses={
         400: {"model": ExceptionResponseDTO},
         401: {"model": ExceptionResponseDTO},
+        404: {"model": ExceptionResponseDTO},
         429: {"model": ExceptionRateLimitResponseDTO}
     }
 )
@@ -97,28 +140,73 @@ async def me(
     request: Request,
     user_logged: UserResponseDTO = Depends(get_current_user)
 ) -> UserResponseDTO:
-    return user_logged
+    return dto_response(await show_service(user_logged))
 
 
+@user_router_v1.head("/file", include_in_schema=False)
 @user_router_v1.get(
     "/file",
     summary="Avatar to user logged",
-    description="Return avatar to user logged",
+    description="Return avatar to user logged, supporting HEAD and byte ranges",
     status_code=status.HTTP_200_OK,
     responses={
+        206: {"description": "Return the requested byte range of the avatar file."},
+        304: {"description": "Avatar not modified since the given ETag."},
         400: {"model": ExceptionResponseDTO},
         401: {"model": ExceptionResponseDTO},
+        404: {"model": ExceptionResponseDTO},
+        416: {"description": "Requested range not satisfiable."},
         429: {"model": ExceptionRateLimitResponseDTO}
     }
 )
 @limiter.limit(str(REQUEST_PER_MINUTES) + "/minute")
 async def file(
     request: Request,
+    size: Literal["original", "medium", "thumb"] = "original",
+    user_logged: UserResponseDTO = Depends(get_current_user)
+):
+    user: UserResponseDTO = await show_service(user_logged)
+    avatar: str = await resolve_variant(
+        user.avatar,
+        "users",
+        size,
+        request.headers.get("accept", "")
+    )
+
+    return await conditional_file_response(
+        request,
+        storage_key(avatar, "users"),
+        avatar,
+        vary="Accept" if size != "original" else None
+    )
+
+
+@user_router_v1.head("/files/{filename}", include_in_schema=False)
+@user_router_v1.get(
+    "/files/{filename}",
+    summary="Avatar by its content-hashed name",
+    description="Return avatar by name, cacheable as immutable",
+    status_code=status.HTTP_200_OK,
+    responses={
+        206: {"description": "Return the requested byte range of the avatar file."},
+        304: {"description": "Avatar not modified since the given ETag."},
+        401: {"model": ExceptionResponseDTO},
+        404: {"model": ExceptionResponseDTO},
+        416: {"description": "Requested range not satisfiable."},
+        429: {"model": ExceptionRateLimitResponseDTO}
+    }
+)
+@limiter.limit(str(REQUEST_PER_MINUTES) + "/minute")
+async def file_by_name(
+    request: Request,
+    filename: str = Path(pattern=HASHED_FILENAME_PATTERN),
     user_logged: UserResponseDTO = Depends(get_current_user)
 ):
-    return FileResponse(
-        path=f"{UPLOAD_DIR}/users/{user_logged.avatar}",
-        filename=user_logged.avatar
+    return await conditional_file_response(
+        request,
+        storage_key(filename, "users"),
+        filename,
+        immutable=True
     )
 
 
@@ -131,7 +219,9 @@ async def file(
     responses={
         400: {"model": ExceptionResponseDTO},
         401: {"model": ExceptionResponseDTO},
-        429: {"model": ExceptionRateLimitResponseDTO}
+        404: {"model": ExceptionResponseDTO},
+        429: {"model": ExceptionRateLimitResponseDTO},
+        503: {"model": ExceptionResponseDTO}
     }
 )
 @limiter.limit(str(REQUEST_PER_MINUTES) + "/minute")
@@ -140,7 +230,10 @@ async def update(
     userUpdateRequestDTO: UserUpdateRequestDTO,
     user_logged: UserResponseDTO = Depends(get_current_user)
 ) -> UserResponseDTO:
-    return await update_service(user_logged.id, userUpdateRequestDTO)
+    return dto_response(
+        await update_service(user_logged.id, userUpdateRequestDTO),
+        status.HTTP_202_ACCEPTED
+    )
 
 
 @user_router_v1.patch(
@@ -151,7 +244,10 @@ async def update(
     response_model=UserResponseDTO,
     responses={
         401: {"model": ExceptionResponseDTO},
+        404: {"model": ExceptionResponseDTO},
         406: {"model": ExceptionResponseDTO},
+        409: {"model": ExceptionResponseDTO},
+        413: {"model": ExceptionResponseDTO},
         429: {"model": ExceptionRateLimitResponseDTO}
     }
 )
@@ -159,6 +255,10 @@ async def update(
 async def upload(
     request: Request,
     avatar: UploadFile,
+    background_tasks: BackgroundTasks,
     user_logged: UserResponseDTO = Depends(get_current_user)
 ) -> UserResponseDTO:
-    return await upload_service(user_logged, avatar)
+    return dto_response(
+        await upload_service(user_logged, avatar, background_tasks),
+        status.HTTP_202_ACCEPTED
+    )
@@ -14,3 +14,11 @@ def exception_error_credential() -> HTTPException:
         status_code=status.HTTP_401_UNAUTHORIZED,
         headers={"WWW-Authenticate": "Bearer"}
     )
+
+
+def exception_error_unavailable() -> HTTPException:
+    return HTTPException(
+        detail="Server busy, try again later",
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "1"}
+    )
@@ -1,112 +1,207 @@
-from typing import List
+from typing import Dict, List
 from core.prisma_connection import prisma_connection
+from core.instrumentation import observe_repository
 
 from prisma import Prisma
-from prisma.models import Category, Product
+from prisma.models import Category
+from prisma.partials import CategorySummary, ProductInCategory
 
 from api.dtos.responses.category.category_response_dto import (
     CategoryResponseDTO,
-    CategoryDetailResponseDTO
+    CategoryDetailResponseDTO,
+    CategoryPageResponseDTO,
+    CategorySummaryResponseDTO,
+    CategorySummaryItemResponseDTO,
+    ProductResponseDTO
 )
 from api.dtos.requests.category.create_request_dto import CategoryCreateRequestDTO
 from api.dtos.requests.category.update_request_dto import CategoryUpdateRequestDTO
+from api.utils.pagination import (
+    Position,
+    KEYSET_ORDER,
+    encode_cursor,
+    keyset_where
+)
+
 
-prisma_db: Prisma = Prisma()
+def _category_response(category: Category) -> CategoryResponseDTO:
+    return CategoryResponseDTO.model_construct(
+        id=category.id,
+        name=category.name,
+        updated_at=category.updateAt
+    )
 
 
+@observe_repository
 async def store_repository(categoryCreateRequestDTO: CategoryCreateRequestDTO) -> CategoryResponseDTO:
-    await prisma_db.connect()
+    prisma_db: Prisma = await prisma_connection()
     category: Category = await prisma_db.category.create({
         "name": categoryCreateRequestDTO.name,
     })
-    await prisma_db.disconnect()
 
-    return CategoryResponseDTO(
-        id=category.id,
-        name=category.name
+    return _category_response(category)
+
+
+@observe_repository
+async def find_many_repository(category_ids: List[str]) -> Dict[str, Category]:
+    prisma_db: Prisma = await prisma_connection()
+    categories: List[Category] = await prisma_db.category.find_many(
+        where={"id": {"in": category_ids}}
     )
 
+    return {category.id: category for category in categories}
 
-async def find_by_name_repository(name: str) -> CategoryResponseDTO | None:
-    await prisma_db.connect()
-    category: Category = await prisma_db.category.find_unique({"name": name})
-    await prisma_db.disconnect()
 
-    if category != None:
-        return CategoryResponseDTO(
-            id=category.id,
-            name=category.name
-        )
+@observe_repository
+async def trigger_exists_repository(name: str) -> bool:
+    prisma_db: Prisma = await prisma_connection()
+    rows: List[dict] = await prisma_db.query_raw(
+        'SELECT 1 AS "exists" FROM pg_trigger WHERE tgname = $1',
+        name
+    )
 
-    return None
+    return rows != []
 
 
-async def show_repository(category_id: str) -> CategoryDetailResponseDTO | None:
-    await prisma_db.connect()
-    category: Category = await prisma_db.category.find_unique(
-        where={"id": category_id},
-        include={"Product": True}
-    )
-    await prisma_db.disconnect()
+@observe_repository
+async def find_all_repository() -> List[Category]:
+    prisma_db: Prisma = await prisma_connection()
+    return await prisma_db.category.find_many(order=KEYSET_ORDER)
+
 
-    if category != None:
-        products: List = []
+@observe_repository
+async def show_repository(
+    category_id: str,
+    limit: int,
+    position: Position | None,
+    count_only: bool
+) -> CategoryDetailResponseDTO | None:
+    prisma_db: Prisma = await prisma_connection()
+    category: Category | None = await prisma_db.category.find_unique(
+        where={"id": category_id}
+    )
 
-        for product in category.Product:
-            products.append({
-                "id": product.id,
-                "name": product.name,
-                "description": product.description,
-                "banner": product.banner
-            })
+    if category == None:
+        return None
 
-        return CategoryDetailResponseDTO(
+    if count_only:
+        return CategoryDetailResponseDTO.model_construct(
             id=category.id,
             name=category.name,
-            products=products
+            updated_at=category.updateAt,
+            products=[],
+            product_count=category.productCount,
+            next_cursor=None
         )
 
-    return None
+    products_db: List[ProductInCategory] = await ProductInCategory.prisma(prisma_db).find_many(
+        take=limit + 1,
+        where={"categoryId": category_id, **(keyset_where(position) or {})},
+        order=KEYSET_ORDER
+    )
+
+    products: List[ProductResponseDTO] = []
+
+    for product in products_db[:limit]:
+        products.append(ProductResponseDTO.model_construct(
+            id=product.id,
+            name=product.name,
+            description=product.description,
+            banner=product.banner,
+            updated_at=product.updateAt
+        ))
+
+    next_cursor: str | None = None
+
+    if len(products_db) > limit:
+        last: ProductInCategory = products_db[limit - 1]
+        next_cursor = encode_cursor(last.createdAt, last.id)
 
+    return CategoryDetailResponseDTO.model_construct(
+        id=category.id,
+        name=category.name,
+        updated_at=category.updateAt,
+        products=products,
+        product_count=None,
+        next_cursor=next_cursor
+    )
+
+
+@observe_repository
+async def index_repository(limit: int, position: Position | None) -> CategoryPageResponseDTO:
+    prisma_db: Prisma = await prisma_connection()
+    categories_db: List[Category] = await prisma_db.category.find_many(
+        take=limit + 1,
+        where=keyset_where(position),
+        order=KEYSET_ORDER
+    )
+
+    categories: List[CategoryResponseDTO] = []
+
+    for category in categories_db[:limit]:
+        categories.append(_category_response(category))
+
+    next_cursor: str | None = None
+
+    if len(categories_db) > limit:
+        last: Category = categories_db[limit - 1]
+        next_cursor = encode_cursor(last.createdAt, last.id)
+
+    return CategoryPageResponseDTO(
+        items=categories,
+        next_cursor=next_cursor
+    )
 
-async def index_repository() -> List[CategoryResponseDTO]:
-    await prisma_db.connect()
-    categories: List[Category] = await prisma_db.category.find_many()
-    await prisma_db.disconnect()
 
-    return categories
+@observe_repository
+async def summary_repository() -> CategorySummaryResponseDTO:
+    prisma_db: Prisma = await prisma_connection()
+    categories: List[CategorySummary] = await CategorySummary.prisma(prisma_db).find_many(
+        order={"name": "asc"}
+    )
+
+    return CategorySummaryResponseDTO.model_construct(
+        items=[
+            CategorySummaryItemResponseDTO.model_construct(
+                id=category.id,
+                name=category.name,
+                product_count=category.productCount
+            )
+            for category in categories
+        ]
+    )
 
 
+@observe_repository
 async def update_repository(
     category_id: str,
     categoryUpdateRequestDTO: CategoryUpdateRequestDTO
-) -> CategoryDetailResponseDTO:
-    await prisma_db.connect()
-    category: Category = await prisma_db.category.update(
+) -> CategoryResponseDTO | None:
+    prisma_db: Prisma = await prisma_connection()
+    category: Category | None = await prisma_db.category.update(
         data={"name": categoryUpdateRequestDTO.name},
-        where={"id": category_id},
-        include={"Product": True}
+        where={"id": category_id}
     )
-    await prisma_db.disconnect()
 
-    products: List = []
+    if category == None:
+        return None
 
-    for product in category.Product:
-        products.append({
-            "id": product.id,
-            "name": product.name,
-            "description": product.description,
-            "banner": product.banner
-        })
+    return _category_response(category)
 
-    return CategoryDetailResponseDTO(
-        id=category.id,
-        name=category.name,
-        products=products
+
+@observe_repository
+async def count_products_repository(category_id: str) -> int:
+    prisma_db: Prisma = await prisma_connection()
+    category: CategorySummary | None = await CategorySummary.prisma(prisma_db).find_unique(
+        where={"id": category_id}
     )
 
+    return category.productCount if category != None else 0
+
+
+@observe_repository
+async def destroy_repository(category_id: str) -> bool:
+    prisma_db: Prisma = await prisma_connection()
+    category: Category | None = await prisma_db.category.delete({"id": category_id})
 
-async def destroy_repository(category_id: str) -> None:
-    await prisma_db.connect()
-    await prisma_db.category.delete({"id": category_id})
-    await prisma_db.disconnect()
+    return category != None
@@ -1,163 +1,462 @@
-from typing import List
-from core.prisma_connection import prisma_connection
+import re
+
+from collections import Counter
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Set, Tuple
+from core.prisma_connection import prisma_connection, locked_transaction
+from core.instrumentation import observe_repository
 
 from prisma import Prisma
 from prisma.models import Product
+from prisma.partials import ProductBanner
 
 from api.dtos.requests.product.create_request_dto import ProductCreateRequestDTO
 from api.dtos.requests.product.update_request_dto import ProductUpdateRequestDTO
+from api.dtos.requests.product.bulk_request_dto import ProductBulkUpdateItemRequestDTO
+from api.dtos.requests.product.filter_request_dto import ProductFilterRequestDTO
 from api.dtos.responses.product.product_response_dto import (
+    CategoryResponseDTO,
     ProductResponseDTO,
-    ProductNameResponseDTO
+    ProductPageResponseDTO
+)
+from api.utils.category_cache import resolve_categories
+from api.utils.pagination import (
+    Position,
+    KEYSET_ORDER,
+    encode_cursor,
+    encode_offset_cursor,
+    keyset_order,
+    keyset_where
 )
 
-prisma_db: Prisma = Prisma()
 
+ADJUST_PRODUCT_COUNT: str = """
+    UPDATE "categories" SET "productCount" = "productCount" + $1 WHERE "id" = $2
+"""
 
-async def store_repository(productCreateRequestDTO: ProductCreateRequestDTO) -> ProductResponseDTO:
-    await prisma_db.connect()
-    product: Product = await prisma_db.product.create(
-        data={
-            "name": productCreateRequestDTO.name,
-            "description": productCreateRequestDTO.description,
-            "categoryId": productCreateRequestDTO.category_id
-        },
-        include={"category": True}
+
+async def _product_responses(products: List[Product]) -> List[ProductResponseDTO]:
+    categories: List[CategoryResponseDTO | None] = await resolve_categories(
+        product.categoryId for product in products
     )
-    await prisma_db.disconnect()
 
-    category: object = {
-        "id": product.category.id,
-        "name": product.category.name
-    }
+    return [
+        ProductResponseDTO.model_construct(
+            id=product.id,
+            name=product.name,
+            description=product.description,
+            banner=product.banner,
+            updated_at=product.updateAt,
+            category=category
+        )
+        for product, category in zip(products, categories)
+    ]
+
+
+async def _product_response(product: Product) -> ProductResponseDTO:
+    return (await _product_responses([product]))[0]
+
+
+async def _adjust_product_count(transaction: Prisma, deltas: Counter) -> None:
+    # raw update so the category's updateAt (and its ETag) is left untouched;
+    # sorted to take the row locks in the same order in every transaction
+    for category_id in sorted(deltas):
+        if deltas[category_id] != 0:
+            await transaction.execute_raw(ADJUST_PRODUCT_COUNT, deltas[category_id], category_id)
 
-    return ProductResponseDTO(
-        id=product.id,
-        name=product.name,
-        description=product.description,
-        banner=product.banner,
-        category=category
+
+async def _lock_categories(transaction: Prisma, product_ids: List[str]) -> Dict[str, str]:
+    if product_ids == []:
+        return {}
+
+    placeholders: str = ", ".join(f"${index}" for index in range(1, len(product_ids) + 1))
+    rows: List[dict] = await transaction.query_raw(
+        # ordered so overlapping bulk moves lock their rows in the same order
+        f'SELECT "id", "categoryId" FROM "products" WHERE "id" IN ({placeholders}) '
+        'ORDER BY "id" FOR UPDATE',
+        *product_ids
     )
 
+    return {row["id"]: row["categoryId"] for row in rows}
 
-async def find_by_name_repository(name: str) -> ProductNameResponseDTO | None:
-    await prisma_db.connect()
-    product: Product = await prisma_db.product.find_unique({"name": name})
-    await prisma_db.disconnect()
 
-    if product != None:
-        return ProductNameResponseDTO(
-            id=product.id,
-            name=product.name,
-            description=product.description,
-            banner=product.banner
+@observe_repository
+async def store_repository(productCreateRequestDTO: ProductCreateRequestDTO) -> ProductResponseDTO:
+    prisma_db: Prisma = await prisma_connection()
+
+    async with prisma_db.tx() as transaction:
+        product: Product = await transaction.product.create(
+            data={
+                "name": productCreateRequestDTO.name,
+                "description": productCreateRequestDTO.description,
+                "categoryId": productCreateRequestDTO.category_id
+            }
         )
+        await _adjust_product_count(transaction, Counter({product.categoryId: 1}))
 
-    return None
+    return await _product_response(product)
+
+
+@observe_repository
+async def find_by_names_repository(names: List[str]) -> Dict[str, str]:
+    prisma_db: Prisma = await prisma_connection()
+    products: List[Product] = await prisma_db.product.find_many(
+        where={"name": {"in": names}}
+    )
+
+    return {product.name: product.id for product in products}
+
+
+@observe_repository
+async def find_by_ids_repository(product_ids: List[str]) -> Dict[str, ProductResponseDTO]:
+    prisma_db: Prisma = await prisma_connection()
+    products: List[Product] = await prisma_db.product.find_many(
+        where={"id": {"in": product_ids}}
+    )
+
+    responses: List[ProductResponseDTO] = await _product_responses(products)
 
+    return {response.id: response for response in responses}
 
+
+@observe_repository
 async def show_repository(product_id: str) -> ProductResponseDTO | None:
-    await prisma_db.connect()
+    prisma_db: Prisma = await prisma_connection()
     product: Product = await prisma_db.product.find_unique(
-        where={"id": product_id},
-        include={"category": True}
+        where={"id": product_id}
     )
-    await prisma_db.disconnect()
 
     if product != None:
-        category: object = {
-            "id": product.category.id,
-            "name": product.category.name
-        }
+        return await _product_response(product)
 
-        return ProductResponseDTO(
-            id=product.id,
-            name=product.name,
-            description=product.description,
-            banner=product.banner,
-            category=category
-        )
+    return None
+
+
+@observe_repository
+async def find_banner_repository(product_id: str) -> str | None:
+    prisma_db: Prisma = await prisma_connection()
+    product: ProductBanner | None = await ProductBanner.prisma(prisma_db).find_unique(
+        where={"id": product_id}
+    )
+
+    if product != None:
+        return product.banner
 
     return None
 
 
-async def index_repository() -> List[ProductResponseDTO]:
-    await prisma_db.connect()
-    products_db: List[Product] = await prisma_db.product.find_many(include={"category": True})
-    await prisma_db.disconnect()
+SORT_FIELDS: Dict[str, str] = {
+    "created_at": "createdAt",
+    "name": "name",
+}
 
-    products: List = []
 
-    for product in products_db:
-        category: object = {
-            "id": product.category.id,
-            "name": product.category.name
-        }
+def _range(start: datetime | None, end: datetime | None) -> dict | None:
+    bounds: dict = {}
 
-        products.append({
-            "id": product.id,
-            "name": product.name,
-            "description": product.description,
-            "banner": product.banner,
-            "category": category
-        })
+    if start != None:
+        bounds["gte"] = start
 
-    return products
+    if end != None:
+        bounds["lte"] = end
 
+    return bounds or None
 
-async def update_repository(
-    product_id: str,
-    productUpdateRequestDTO: ProductUpdateRequestDTO
-) -> ProductResponseDTO:
-    await prisma_db.connect()
-    product: Product = await prisma_db.product.update(
-        data={
-            "name": productUpdateRequestDTO.name,
-            "description": productUpdateRequestDTO.description
+
+def _filter_where(filters: ProductFilterRequestDTO) -> dict:
+    where: dict = {}
+
+    if filters.category_id != None:
+        where["categoryId"] = filters.category_id
+
+    if (created := _range(filters.created_from, filters.created_to)) != None:
+        where["createdAt"] = created
+
+    if (updated := _range(filters.updated_from, filters.updated_to)) != None:
+        where["updateAt"] = updated
+
+    return where
+
+
+@observe_repository
+async def index_repository(
+    limit: int,
+    position: Position | None,
+    filters: ProductFilterRequestDTO
+) -> ProductPageResponseDTO:
+    field: str = SORT_FIELDS[filters.sort]
+    prisma_db: Prisma = await prisma_connection()
+    products_db: List[Product] = await prisma_db.product.find_many(
+        take=limit + 1,
+        where={
+            **_filter_where(filters),
+            **(keyset_where(position, field, filters.order) or {})
         },
-        where={"id": product_id},
-        include={"category": True}
+        order=keyset_order(field, filters.order)
     )
-    await prisma_db.disconnect()
 
-    category: object = {
-        "id": product.category.id,
-        "name": product.category.name
-    }
+    products: List[ProductResponseDTO] = await _product_responses(products_db[:limit])
+    next_cursor: str | None = None
 
-    return ProductResponseDTO(
-        id=product.id,
-        name=product.name,
-        description=product.description,
-        banner=product.banner,
-        category=category
+    if len(products_db) > limit:
+        last: Product = products_db[limit - 1]
+        next_cursor = encode_cursor(getattr(last, field), last.id)
+
+    return ProductPageResponseDTO(
+        items=products,
+        next_cursor=next_cursor
     )
 
 
-async def upload_repository(product_id: str, banner: str) -> ProductResponseDTO:
-    await prisma_db.connect()
-    product: Product = await prisma_db.product.update(
-        data={"banner": banner},
-        where={"id": product_id},
-        include={"category": True}
+SEARCH_QUERY: str = """
+    SELECT p."id"
+    FROM "products" p, to_tsquery('simple', $1) query
+    WHERE p."searchVector" @@ query OR p."name" ILIKE $2
+    ORDER BY
+        (p."name" ILIKE $2)::int + coalesce(ts_rank(p."searchVector", query), 0) DESC,
+        p."id" ASC
+    LIMIT $3 OFFSET $4
+"""
+
+
+def search_terms(text: str) -> Tuple[str, str]:
+    words: List[str] = re.findall(r"[^\W_]+", text.lower())
+    tsquery: str = " & ".join(words[:-1] + [f"{words[-1]}:*"]) if words != [] else ""
+    prefix: str = re.sub(r"([\\%_])", r"\\\1", text.strip()) + "%"
+
+    return tsquery, prefix
+
+
+@observe_repository
+async def search_repository(text: str, limit: int, offset: int) -> ProductPageResponseDTO:
+    tsquery, prefix = search_terms(text)
+
+    if tsquery == "":
+        return ProductPageResponseDTO(items=[], next_cursor=None)
+
+    prisma_db: Prisma = await prisma_connection()
+    rows: List[dict] = await prisma_db.query_raw(SEARCH_QUERY, tsquery, prefix, limit + 1, offset)
+    product_ids: List[str] = [row["id"] for row in rows[:limit]]
+
+    products_db: List[Product] = await prisma_db.product.find_many(
+        where={"id": {"in": product_ids}}
+    )
+    products: Dict[str, Product] = {product.id: product for product in products_db}
+
+    return ProductPageResponseDTO(
+        items=await _product_responses([products[id] for id in product_ids if id in products]),
+        next_cursor=encode_offset_cursor(offset + limit) if len(rows) > limit else None
     )
-    await prisma_db.disconnect()
 
-    category: object = {
-        "id": product.category.id,
-        "name": product.category.name
+
+@observe_repository
+async def export_repository(batch_size: int) -> AsyncIterator[List[ProductResponseDTO]]:
+    prisma_db: Prisma = await prisma_connection()
+    position: Position | None = None
+
+    while True:
+        products_db: List[Product] = await prisma_db.product.find_many(
+            take=batch_size,
+            where=keyset_where(position),
+            order=KEYSET_ORDER
+        )
+
+        if products_db == []:
+            return
+
+        yield await _product_responses(products_db)
+
+        if len(products_db) < batch_size:
+            return
+
+        last: Product = products_db[-1]
+        position = (last.createdAt, last.id)
+
+
+@observe_repository
+async def store_many_repository(products: List[dict]) -> Set[str]:
+    prisma_db: Prisma = await prisma_connection()
+
+    async with prisma_db.tx() as transaction:
+        await transaction.product.create_many(
+            data=products,
+            skip_duplicates=True
+        )
+        stored: List[Product] = await transaction.product.find_many(
+            where={"id": {"in": [product["id"] for product in products]}}
+        )
+        await _adjust_product_count(transaction, Counter(product.categoryId for product in stored))
+
+    return {product.id for product in stored}
+
+
+def _update_data(productUpdateRequestDTO: ProductUpdateRequestDTO) -> dict:
+    data: dict = {
+        "name": productUpdateRequestDTO.name,
+        "description": productUpdateRequestDTO.description
     }
 
-    return ProductResponseDTO(
-        id=product.id,
-        name=product.name,
-        description=product.description,
-        banner=product.banner,
-        category=category
-    )
+    if productUpdateRequestDTO.category_id != None:
+        data["category"] = {"connect": {"id": productUpdateRequestDTO.category_id}}
+
+    return data
+
+
+class _ProductNotFound(Exception):
+    pass
+
+
+def _move_deltas(previous: Dict[str, str], moves: Dict[str, str]) -> Counter:
+    deltas: Counter = Counter()
+
+    for product_id, category_id in moves.items():
+        if product_id in previous and previous[product_id] != category_id:
+            deltas[previous[product_id]] -= 1
+            deltas[category_id] += 1
+
+    return deltas
+
+
+@observe_repository
+async def update_repository(
+    product_id: str,
+    productUpdateRequestDTO: ProductUpdateRequestDTO
+) -> ProductResponseDTO | None:
+    prisma_db: Prisma = await prisma_connection()
+
+    if productUpdateRequestDTO.category_id == None:
+        product: Product | None = await prisma_db.product.update(
+            data=_update_data(productUpdateRequestDTO),
+            where={"id": product_id}
+        )
+    else:
+        try:
+            async with prisma_db.tx() as transaction:
+                previous: Dict[str, str] = await _lock_categories(transaction, [product_id])
+                product = await transaction.product.update(
+                    data=_update_data(productUpdateRequestDTO),
+                    where={"id": product_id}
+                )
+
+                # raising rolls the transaction back instead of committing a half-applied move
+                if product == None:
+                    raise _ProductNotFound()
+
+                await _adjust_product_count(
+                    transaction,
+                    _move_deltas(previous, {product_id: productUpdateRequestDTO.category_id})
+                )
+        except _ProductNotFound:
+            return None
+
+    if product == None:
+        return None
+
+    return await _product_response(product)
+
+
+@observe_repository
+async def update_many_repository(products: List[ProductBulkUpdateItemRequestDTO]) -> None:
+    prisma_db: Prisma = await prisma_connection()
+    moves: Dict[str, str] = {
+        product.id: product.category_id for product in products if product.category_id != None
+    }
+
+    async with prisma_db.tx() as transaction:
+        previous: Dict[str, str] = await _lock_categories(transaction, list(moves))
+
+        async with transaction.batch_() as batcher:
+            for product in products:
+                batcher.product.update(
+                    data=_update_data(product),
+                    where={"id": product.id}
+                )
+
+        await _adjust_product_count(transaction, _move_deltas(previous, moves))
+
+
+@observe_repository
+async def upload_repository(
+    product_id: str,
+    banner: str,
+    verify_banner: Callable[[], Awaitable[None]]
+) -> ProductResponseDTO | None:
+    try:
+        async with locked_transaction(f"products/{banner}") as transaction:
+            await verify_banner()
+            product: Product | None = await transaction.product.update(
+                data={"banner": banner},
+                where={"id": product_id}
+            )
+
+            if product == None:
+                raise _ProductNotFound()
+    except _ProductNotFound:
+        return None
+
+    return await _product_response(product)
+
+
+@observe_repository
+async def write_banner_variants_repository(
+    banner: str,
+    write_variants: Callable[[], Awaitable[None]]
+) -> bool:
+    async with locked_transaction(f"products/{banner}") as transaction:
+        if await transaction.product.count(where={"banner": banner}) == 0:
+            return False
+
+        await write_variants()
+
+    return True
+
+
+@observe_repository
+async def release_banner_repository(
+    banner: str,
+    delete_banner: Callable[[], Awaitable[None]]
+) -> bool:
+    async with locked_transaction(f"products/{banner}") as transaction:
+        if await transaction.product.count(where={"banner": banner}) > 0:
+            return False
+
+        await delete_banner()
+
+    return True
+
+
+@observe_repository
+async def destroy_repository(product_id: str) -> ProductResponseDTO | None:
+    prisma_db: Prisma = await prisma_connection()
+
+    async with prisma_db.tx() as transaction:
+        product: Product | None = await transaction.product.delete(
+            where={"id": product_id}
+        )
+
+        if product != None:
+            await _adjust_product_count(transaction, Counter({product.categoryId: -1}))
+
+    if product == None:
+        return None
+
+    return await _product_response(product)
+
+
+@observe_repository
+async def destroy_many_repository(product_ids: List[str]) -> int:
+    prisma_db: Prisma = await prisma_connection()
+
+    async with prisma_db.tx() as transaction:
+        previous: Dict[str, str] = await _lock_categories(transaction, product_ids)
+        deleted: int = await transaction.product.delete_many(
+            where={"id": {"in": list(previous)}}
+        )
+        deltas: Counter = Counter()
+
+        for category_id in previous.values():
+            deltas[category_id] -= 1
 
+        await _adjust_product_count(transaction, deltas)
 
-async def destroy_repository(product_id: str) -> None:
-    await prisma_db.connect()
-    await prisma_db.product.delete({"id": product_id})
-    await prisma_db.disconnect()
+    return deleted
@@ -1,5 +1,5 @@
-from typing import List
-from core.prisma_connection import prisma_connection
+from typing import Awaitable, Callable, Dict, List
+from core.prisma_connection import prisma_connection, locked_transaction
 
 from prisma import Prisma
 from prisma.models import User
@@ -8,20 +8,21 @@ from api.dtos.requests.user.create_request_dto import UserCreateRequestDTO
 from api.dtos.requests.user.update_request_dto import UserUpdateRequestDTO
 from api.dtos.responses.user.user_response_dto import UserResponseDTO, UserWithPassResponseDTO
 
-prisma_db: Prisma = Prisma()
+from core.authentication.user_cache import set_user
+from core.instrumentation import observe_repository
 
 
+@observe_repository
 async def signup_repository(
     userCreateRequestDTO: UserCreateRequestDTO,
     hash: str
 ) -> UserResponseDTO:
-    await prisma_db.connect()
+    prisma_db: Prisma = await prisma_connection()
     user: User = await prisma_db.user.create({
         "name": userCreateRequestDTO.name,
         "email": userCreateRequestDTO.email,
         "password": hash
     })
-    await prisma_db.disconnect()
 
     return UserResponseDTO(
         id=user.id,
@@ -31,10 +32,10 @@ async def signup_repository(
     )
 
 
+@observe_repository
 async def find_by_email(email: str) -> UserWithPassResponseDTO | None:
-    await prisma_db.connect()
+    prisma_db: Prisma = await prisma_connection()
     user: User = await prisma_db.user.find_unique({"email": email})
-    await prisma_db.disconnect()
 
     if user != None:
         return UserWithPassResponseDTO(
@@ -42,62 +43,122 @@ async def find_by_email(email: str) -> UserWithPassResponseDTO | None:
             name=user.name,
             email=user.email,
             password=user.password,
-            avatar=user.avatar
+            avatar=user.avatar,
+            token_version=user.tokenVersion
         )
 
     return None
 
 
-async def find_by_id(user_id: str) -> UserResponseDTO | None:
-    await prisma_db.connect()
-    user: User = await prisma_db.user.find_unique({"id": user_id})
-    await prisma_db.disconnect()
+@observe_repository
+async def find_by_ids_repository(user_ids: List[str]) -> Dict[str, UserResponseDTO]:
+    prisma_db: Prisma = await prisma_connection()
+    users: List[User] = await prisma_db.user.find_many(
+        where={"id": {"in": user_ids}}
+    )
 
-    if user != None:
-        return UserResponseDTO(
+    return {
+        user.id: UserResponseDTO(
             id=user.id,
             name=user.name,
             email=user.email,
             avatar=user.avatar
         )
+        for user in users
+    }
+
+
+@observe_repository
+async def find_token_version_repository(user_id: str) -> int | None:
+    prisma_db: Prisma = await prisma_connection()
+    user: User | None = await prisma_db.user.find_unique({"id": user_id})
+
+    if user != None:
+        return user.tokenVersion
 
     return None
 
 
+@observe_repository
 async def update_repository(
     user_id: str,
     userUpdateRequestDTO: UserUpdateRequestDTO,
     hash: str
-) -> UserResponseDTO:
-    await prisma_db.connect()
-    user: User = await prisma_db.user.update(
+) -> UserResponseDTO | None:
+    prisma_db: Prisma = await prisma_connection()
+    user: User | None = await prisma_db.user.update(
         data={
             "name": userUpdateRequestDTO.name,
-            "password": hash
+            "password": hash,
+            "tokenVersion": {"increment": 1}
         },
         where={"id": user_id}
     )
-    await prisma_db.disconnect()
 
-    return UserResponseDTO(
+    if user == None:
+        return None
+
+    updated: UserResponseDTO = UserResponseDTO(
         id=user.id,
         name=user.name,
         email=user.email,
         avatar=user.avatar
     )
+    set_user(updated)
 
+    return updated
 
-async def upload_repository(user_id: str, avatar: str) -> UserResponseDTO:
-    await prisma_db.connect()
-    user: User = await prisma_db.user.update(
-        data={"avatar": avatar},
-        where={"id": user_id}
-    )
-    await prisma_db.disconnect()
 
-    return UserResponseDTO(
+@observe_repository
+async def upload_repository(
+    user_id: str,
+    avatar: str,
+    verify_avatar: Callable[[], Awaitable[None]]
+) -> UserResponseDTO | None:
+    async with locked_transaction(f"users/{avatar}") as transaction:
+        await verify_avatar()
+        user: User | None = await transaction.user.update(
+            data={"avatar": avatar},
+            where={"id": user_id}
+        )
+
+    if user == None:
+        return None
+
+    updated: UserResponseDTO = UserResponseDTO(
         id=user.id,
         name=user.name,
         email=user.email,
         avatar=user.avatar
     )
+    set_user(updated)
+
+    return updated
+
+
+@observe_repository
+async def write_avatar_variants_repository(
+    avatar: str,
+    write_variants: Callable[[], Awaitable[None]]
+) -> bool:
+    async with locked_transaction(f"users/{avatar}") as transaction:
+        if await transaction.user.count(where={"avatar": avatar}) == 0:
+            return False
+
+        await write_variants()
+
+    return True
+
+
+@observe_repository
+async def release_avatar_repository(
+    avatar: str,
+    delete_avatar: Callable[[], Awaitable[None]]
+) -> bool:
+    async with locked_transaction(f"users/{avatar}") as transaction:
+        if await transaction.user.count(where={"avatar": avatar}) > 0:
+            return False
+
+        await delete_avatar()
+
+    return True
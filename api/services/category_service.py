@@ -1,41 +1,82 @@
-from typing import List
 from fastapi import status
 from prisma.models import Category
+from prisma.errors import UniqueViolationError, ForeignKeyViolationError
 
 from api.dtos.requests.category.create_request_dto import CategoryCreateRequestDTO
 from api.dtos.requests.category.update_request_dto import CategoryUpdateRequestDTO
 from api.dtos.responses.category.category_response_dto import (
     CategoryResponseDTO,
-    CategoryDetailResponseDTO
+    CategoryDetailResponseDTO,
+    CategoryPageResponseDTO,
+    CategorySummaryResponseDTO
 )
 from api.repositories.category_repository import (
     store_repository,
-    find_by_name_repository,
     show_repository,
     index_repository,
+    summary_repository,
     update_repository,
+    count_products_repository,
     destroy_repository
 )
 from api.exception.http_exception import exception_error
+from api.utils.category_cache import (
+    is_loaded,
+    category_page,
+    refresh_category,
+    forget_category
+)
+from api.utils.pagination import Position, decode_cursor
 
+from core.cache import get_or_load, versioned_key, bump
+from core.instrumentation import observe_service
 
-async def store_service(categoryCreateRequestDTO: CategoryCreateRequestDTO) -> CategoryResponseDTO:
-    category_name_exists: CategoryResponseDTO | None = await find_by_name_repository(
-        categoryCreateRequestDTO.name
-    )
 
-    if category_name_exists != None:
+def _decode_position(cursor: str | None) -> Position | None:
+    if cursor == None:
+        return None
+
+    position: Position | None = decode_cursor(cursor)
+
+    if position == None:
+        raise exception_error(
+            "Cursor invalid",
+            status.HTTP_400_BAD_REQUEST
+        )
+
+    return position
+
+
+@observe_service
+async def store_service(categoryCreateRequestDTO: CategoryCreateRequestDTO) -> CategoryResponseDTO:
+    try:
+        category: CategoryResponseDTO = await store_repository(categoryCreateRequestDTO)
+    except UniqueViolationError:
         raise exception_error(
             "Category name already exists",
             status.HTTP_409_CONFLICT
         )
 
-    category: CategoryResponseDTO = await store_repository(categoryCreateRequestDTO)
+    await refresh_category(category.id)
+    await bump("categories")
+
     return category
 
 
-async def show_service(category_id: str) -> CategoryDetailResponseDTO:
-    category: CategoryDetailResponseDTO | None = await show_repository(category_id)
+@observe_service
+async def show_service(
+    category_id: str,
+    limit: int,
+    cursor: str | None,
+    products: str
+) -> CategoryDetailResponseDTO:
+    position: Position | None = _decode_position(cursor)
+
+    category: CategoryDetailResponseDTO | None = await get_or_load(
+        await versioned_key(f"category:{category_id}", products, limit, cursor),
+        CategoryDetailResponseDTO,
+        lambda: show_repository(category_id, limit, position, products == "count")
+    )
 
     if category == None:
         raise exception_error(
@@ -46,54 +87,82 @@ async def show_service(category_id: str) -> CategoryDetailResponseDTO:
     return category
 
 
-async def index_service() -> List[CategoryResponseDTO]:
-    categories: List[CategoryResponseDTO] = await index_repository()
+@observe_service
+async def index_service(limit: int, cursor: str | None) -> CategoryPageResponseDTO:
+    position: Position | None = _decode_position(cursor)
+
+    if is_loaded():
+        return category_page(limit, position)
+
+    categories: CategoryPageResponseDTO = await get_or_load(
+        await versioned_key("categories", limit, cursor),
+        CategoryPageResponseDTO,
+        lambda: index_repository(limit, position)
+    )
     return categories
 
 
+@observe_service
+async def summary_service() -> CategorySummaryResponseDTO:
+    summary: CategorySummaryResponseDTO = await summary_repository()
+    return summary
+
+
+@observe_service
 async def update_service(
     category_id: str,
     categoryUpdateRequestDTO: CategoryUpdateRequestDTO
-) -> CategoryDetailResponseDTO:
-    category_exists: CategoryDetailResponseDTO | None = await show_repository(category_id)
-
-    if category_exists == None:
-        raise exception_error(
-            "Category not found",
-            status.HTTP_404_NOT_FOUND
+) -> CategoryResponseDTO:
+    try:
+        category: CategoryResponseDTO | None = await update_repository(
+            category_id,
+            categoryUpdateRequestDTO
         )
-
-    category_name_exists: CategoryResponseDTO | None = await find_by_name_repository(
-        categoryUpdateRequestDTO.name
-    )
-
-    if category_name_exists != None:
+    except UniqueViolationError:
         raise exception_error(
             "Category name already exists",
             status.HTTP_409_CONFLICT
         )
 
-    category: CategoryDetailResponseDTO = await update_repository(
-        category_id,
-        categoryUpdateRequestDTO
-    )
+    if category == None:
+        raise exception_error(
+            "Category not found",
+            status.HTTP_404_NOT_FOUND
+        )
+
+    await refresh_category(category_id)
+    await bump(f"category:{category_id}")
+    await bump("categories")
+    await bump("product")
+    await bump("products")
 
     return category
 
 
+@observe_service
 async def destroy_service(category_id: str) -> None:
-    category: CategoryDetailResponseDTO | None = await show_repository(category_id)
+    products_count: int = await count_products_repository(category_id)
 
-    if category == None:
+    if products_count > 0:
         raise exception_error(
-            "Category not found",
-            status.HTTP_404_NOT_FOUND
+            "Category have relationship with products registered",
+            status.HTTP_422_UNPROCESSABLE_ENTITY
         )
 
-    if category.products != []:
+    try:
+        category_deleted: bool = await destroy_repository(category_id)
+    except ForeignKeyViolationError:
         raise exception_error(
             "Category have relationship with products registered",
             status.HTTP_422_UNPROCESSABLE_ENTITY
         )
 
-    await destroy_repository(category_id)
+    if category_deleted == False:
+        raise exception_error(
+            "Category not found",
+            status.HTTP_404_NOT_FOUND
+        )
+
+    forget_category(category_id)
+    await bump(f"category:{category_id}")
+    await bump("categories")
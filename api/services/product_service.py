@@ -1,60 +1,132 @@
-from typing import List
-from fastapi import status, UploadFile
+from typing import AsyncIterator, Dict, List, Set
+from uuid import uuid4
+from fastapi import status, UploadFile, BackgroundTasks
 from prisma.models import Product
+from prisma.errors import (
+    UniqueViolationError,
+    ForeignKeyViolationError,
+    RecordNotFoundError
+)
 
 from api.dtos.requests.product.create_request_dto import ProductCreateRequestDTO
 from api.dtos.requests.product.update_request_dto import ProductUpdateRequestDTO
+from api.dtos.requests.product.filter_request_dto import ProductFilterRequestDTO
+from api.dtos.requests.product.bulk_request_dto import (
+    ProductBulkCreateRequestDTO,
+    ProductBulkUpdateRequestDTO,
+    ProductBulkUpdateItemRequestDTO,
+    ProductBulkDeleteRequestDTO
+)
 from api.dtos.responses.product.product_response_dto import (
+    CategoryResponseDTO,
     ProductResponseDTO,
-    ProductNameResponseDTO
+    ProductPageResponseDTO
+)
+from api.dtos.responses.product.bulk_response_dto import (
+    ProductBulkItemResponseDTO,
+    ProductBulkResponseDTO
 )
-from api.dtos.responses.category.category_response_dto import CategoryDetailResponseDTO
 from api.repositories.product_repository import (
     store_repository,
-    find_by_name_repository,
+    store_many_repository,
+    find_by_names_repository,
+    find_by_ids_repository,
     show_repository,
+    SORT_FIELDS,
     index_repository,
+    search_repository,
+    export_repository,
     update_repository,
+    update_many_repository,
     upload_repository,
-    destroy_repository
+    find_banner_repository,
+    write_banner_variants_repository,
+    release_banner_repository,
+    destroy_repository,
+    destroy_many_repository
 )
-from api.repositories.category_repository import show_repository as show_repository_by_category
 from api.exception.http_exception import exception_error
+from api.utils.category_cache import resolve_categories
+from api.utils.filename_cache import resolve_filename, set_filename, forget_filename
+from api.utils.images import generate_variants
+from api.utils.pagination import Position, decode_cursor, decode_offset_cursor
 from api.utils.storage import (
-    verify_ext_file,
-    generate_hash_filename,
+    verify_image_file,
     upload_file,
     delete_file
 )
 
+from core.cache import get_or_load, versioned_key, bump, invalidate
+from core.config import EXPORT_BATCH_SIZE, BULK_MAX_SIZE
+from core.instrumentation import observe_service
+
+
+async def _invalidate_products(*products: ProductResponseDTO) -> None:
+    keys: Set[str] = set()
+
+    for product in products:
+        keys.add(await versioned_key("product", product.id))
+
+    if keys != set():
+        await invalidate(*keys)
+
+    for category_id in {product.category.id for product in products}:
+        await bump(f"category:{category_id}")
+
+    await bump("products")
+
+
+async def _release_banners(*banners: str) -> None:
+    released: Set[str] = {banner for banner in banners if banner != ""}
+
+    if released == set():
+        return
+
+    for banner in sorted(released):
+        await release_banner_repository(banner, lambda: delete_file(banner, "products"))
 
-async def store_service(productCreateRequestDTO: ProductCreateRequestDTO) -> ProductResponseDTO:
-    category_exists: CategoryDetailResponseDTO | None = await show_repository_by_category(
-        productCreateRequestDTO.category_id
-    )
 
-    if category_exists == None:
+async def _existing_categories(category_ids: Set[str]) -> Set[str]:
+    categories: List[CategoryResponseDTO | None] = await resolve_categories(category_ids)
+
+    return {category.id for category in categories if category != None}
+
+
+def _verify_batch_size(size: int) -> None:
+    if size > BULK_MAX_SIZE:
         raise exception_error(
-            "Category not found",
-            status.HTTP_404_NOT_FOUND
+            f"Batch too large. Max {BULK_MAX_SIZE} items",
+            status.HTTP_422_UNPROCESSABLE_ENTITY
         )
 
-    product_name_exists: ProductNameResponseDTO | None = await find_by_name_repository(
-        productCreateRequestDTO.name
-    )
 
-    if product_name_exists != None:
+@observe_service
+async def store_service(productCreateRequestDTO: ProductCreateRequestDTO) -> ProductResponseDTO:
+    try:
+        product: ProductResponseDTO = await store_repository(productCreateRequestDTO)
+    except ForeignKeyViolationError:
+        raise exception_error(
+            "Category not found",
+            status.HTTP_404_NOT_FOUND
+        )
+    except UniqueViolationError:
         raise exception_error(
             "Product name already exists",
             status.HTTP_409_CONFLICT
         )
 
-    product: ProductResponseDTO = await store_repository(productCreateRequestDTO)
+    await _invalidate_products(product)
+
     return product
 
 
+@observe_service
 async def show_service(category_id: str) -> ProductResponseDTO:
-    product: ProductResponseDTO | None = await show_repository(category_id)
+    product: ProductResponseDTO | None = await get_or_load(
+        await versioned_key("product", category_id),
+        ProductResponseDTO,
+        lambda: show_repository(category_id)
+    )
 
     if product == None:
         raise exception_error(
@@ -65,42 +137,135 @@ async def show_service(category_id: str) -> ProductResponseDTO:
     return product
 
 
-async def index_service() -> List[ProductResponseDTO]:
-    products: List[ProductResponseDTO] = await index_repository()
+@observe_service
+async def show_banner_service(product_id: str, refresh: bool = False) -> str:
+    if refresh:
+        forget_filename("products", product_id)
+
+    banner: str | None = await resolve_filename("products", product_id, find_banner_repository)
+
+    if banner == None:
+        raise exception_error(
+            "Product not found",
+            status.HTTP_404_NOT_FOUND
+        )
+
+    return banner
+
+
+@observe_service
+async def index_service(
+    limit: int,
+    cursor: str | None,
+    filters: ProductFilterRequestDTO
+) -> ProductPageResponseDTO:
+    position: Position | None = None
+
+    if cursor != None:
+        position = decode_cursor(cursor, SORT_FIELDS[filters.sort])
+
+        if position == None:
+            raise exception_error(
+                "Cursor invalid",
+                status.HTTP_400_BAD_REQUEST
+            )
+
+    products: ProductPageResponseDTO = await get_or_load(
+        await versioned_key("products", limit, cursor, filters.model_dump_json()),
+        ProductPageResponseDTO,
+        lambda: index_repository(limit, position, filters)
+    )
     return products
 
 
+@observe_service
+async def search_service(text: str, limit: int, cursor: str | None) -> ProductPageResponseDTO:
+    offset: int | None = 0
+
+    if cursor != None:
+        offset = decode_offset_cursor(cursor)
+
+        if offset == None:
+            raise exception_error(
+                "Cursor invalid",
+                status.HTTP_400_BAD_REQUEST
+            )
+
+    products: ProductPageResponseDTO = await get_or_load(
+        await versioned_key("products", "search", text.strip().lower(), limit, cursor),
+        ProductPageResponseDTO,
+        lambda: search_repository(text, limit, offset)
+    )
+    return products
+
+
+@observe_service
+async def export_service(format: str) -> AsyncIterator[bytes]:
+    if format == "json":
+        separator: bytes = b"["
+
+        async for products in export_repository(EXPORT_BATCH_SIZE):
+            yield separator + b",".join(
+                product.model_dump_json().encode() for product in products
+            )
+            separator = b","
+
+        yield b"[]" if separator == b"[" else b"]"
+        return
+
+    async for products in export_repository(EXPORT_BATCH_SIZE):
+        yield b"".join(
+            product.model_dump_json().encode() + b"\n" for product in products
+        )
+
+
+@observe_service
 async def update_service(
     product_id: str,
     productUpdateRequestDTO: ProductUpdateRequestDTO
 ) -> ProductResponseDTO:
-    product_exists: ProductResponseDTO | None = await show_repository(product_id)
+    previous: List[ProductResponseDTO] = []
 
-    if (product_exists == None):
-        raise exception_error(
-            "Product not found",
-            status.HTTP_404_NOT_FOUND
-        )
+    if productUpdateRequestDTO.category_id != None:
+        if (await resolve_categories([productUpdateRequestDTO.category_id]))[0] == None:
+            raise exception_error(
+                "Category not found",
+                status.HTTP_404_NOT_FOUND
+            )
 
-    product_name_exists: ProductResponseDTO | None = await find_by_name_repository(
-        productUpdateRequestDTO.name
-    )
+        moved: ProductResponseDTO | None = await show_repository(product_id)
+
+        if moved != None:
+            previous.append(moved)
 
-    if product_name_exists != None:
+    try:
+        product: ProductResponseDTO | None = await update_repository(
+            product_id,
+            productUpdateRequestDTO
+        )
+    except UniqueViolationError:
         raise exception_error(
             "Product name already exists",
             status.HTTP_409_CONFLICT
         )
 
-    product: ProductResponseDTO = await update_repository(
-        product_id,
-        productUpdateRequestDTO
-    )
+    if product == None:
+        raise exception_error(
+            "Product not found",
+            status.HTTP_404_NOT_FOUND
+        )
+
+    await _invalidate_products(product, *previous)
 
     return product
 
 
-async def upload_service(product_id: str, banner: UploadFile) -> ProductResponseDTO:
+@observe_service
+async def upload_service(
+    product_id: str,
+    banner: UploadFile,
+    background_tasks: BackgroundTasks
+) -> ProductResponseDTO:
     product: ProductResponseDTO | None = await show_repository(product_id)
 
     if (product == None):
@@ -109,32 +274,266 @@ async def upload_service(product_id: str, banner: UploadFile) -> ProductResponse
             status.HTTP_404_NOT_FOUND
         )
 
-    banner_verify: bool = verify_ext_file(banner)
+    banner_type: str | None = await verify_image_file(banner)
 
-    if banner_verify == False:
+    if banner_type == None:
         raise exception_error(
             "Type file invalid. Only select (.jpg, .jpeg, .png)",
             status.HTTP_406_NOT_ACCEPTABLE
         )
 
-    banner_hash_name: str = generate_hash_filename(banner)
+    old_banner: str = product.banner
 
-    if product.banner != "":
-        delete_file(product.banner, "products")
+    banner_hash_name, product = await upload_file(
+        banner_type,
+        "products",
+        banner,
+        lambda filename, verify: upload_repository(product_id, filename, verify)
+    )
 
-    await upload_file(banner_hash_name, "products", banner)
-    product: ProductResponseDTO = await upload_repository(product_id, banner_hash_name)
+    if product == None:
+        await _release_banners(banner_hash_name)
+        raise exception_error(
+            "Product not found",
+            status.HTTP_404_NOT_FOUND
+        )
+
+    background_tasks.add_task(
+        generate_variants,
+        banner_hash_name,
+        "products",
+        lambda write: write_banner_variants_repository(banner_hash_name, write)
+    )
+    set_filename("products", product_id, banner_hash_name)
+    await _invalidate_products(product)
+
+    if old_banner != banner_hash_name:
+        await _release_banners(old_banner)
 
     return product
 
 
+@observe_service
 async def destroy_service(product_id: str) -> None:
-    product_exists: ProductResponseDTO | None = await show_repository(product_id)
+    product: ProductResponseDTO | None = await destroy_repository(product_id)
+
+    if product == None:
+        raise exception_error(
+            "Product not found",
+            status.HTTP_404_NOT_FOUND
+        )
+
+    forget_filename("products", product_id)
+    await _invalidate_products(product)
+    await _release_banners(product.banner)
+
 
-    if (product_exists == None):
+@observe_service
+async def bulk_store_service(
+    productBulkCreateRequestDTO: ProductBulkCreateRequestDTO
+) -> ProductBulkResponseDTO:
+    items = productBulkCreateRequestDTO.items
+    _verify_batch_size(len(items))
+
+    categories: Set[str] = await _existing_categories({item.category_id for item in items})
+    names_taken: Dict[str, str] = await find_by_names_repository(
+        list({item.name for item in items})
+    )
+
+    results: List[ProductBulkItemResponseDTO] = []
+    products: List[dict] = []
+
+    for index, item in enumerate(items):
+        if item.category_id not in categories:
+            results.append(ProductBulkItemResponseDTO(
+                index=index,
+                id=None,
+                status=status.HTTP_404_NOT_FOUND,
+                detail="Category not found"
+            ))
+            continue
+
+        if item.name in names_taken:
+            results.append(ProductBulkItemResponseDTO(
+                index=index,
+                id=None,
+                status=status.HTTP_409_CONFLICT,
+                detail="Product name already exists"
+            ))
+            continue
+
+        product_id: str = str(uuid4())
+        names_taken[item.name] = product_id
+
+        products.append({
+            "id": product_id,
+            "name": item.name,
+            "description": item.description,
+            "categoryId": item.category_id
+        })
+        results.append(ProductBulkItemResponseDTO(
+            index=index,
+            id=product_id,
+            status=status.HTTP_201_CREATED,
+            detail=None
+        ))
+
+    if products == []:
+        return ProductBulkResponseDTO(items=results)
+
+    try:
+        stored: Set[str] = await store_many_repository(products)
+    except ForeignKeyViolationError:
+        raise exception_error(
+            "Category not found",
+            status.HTTP_404_NOT_FOUND
+        )
+
+    if len(stored) < len(products):
+        for result in results:
+            if result.status == status.HTTP_201_CREATED and result.id not in stored:
+                result.id = None
+                result.status = status.HTTP_409_CONFLICT
+                result.detail = "Product name already exists"
+
+    for category_id in {product["categoryId"] for product in products}:
+        await bump(f"category:{category_id}")
+
+    await bump("products")
+
+    return ProductBulkResponseDTO(items=results)
+
+
+@observe_service
+async def bulk_update_service(
+    productBulkUpdateRequestDTO: ProductBulkUpdateRequestDTO
+) -> ProductBulkResponseDTO:
+    items = productBulkUpdateRequestDTO.items
+    _verify_batch_size(len(items))
+
+    existing: Dict[str, ProductResponseDTO] = await find_by_ids_repository(
+        list({item.id for item in items})
+    )
+    names_taken: Dict[str, str] = await find_by_names_repository(
+        list({item.name for item in items})
+    )
+    categories: Set[str] = await _existing_categories(
+        {item.category_id for item in items if item.category_id != None}
+    )
+
+    results: List[ProductBulkItemResponseDTO] = []
+    products: List[ProductBulkUpdateItemRequestDTO] = []
+    updated_ids: Set[str] = set()
+
+    for index, item in enumerate(items):
+        if item.id not in existing:
+            results.append(ProductBulkItemResponseDTO(
+                index=index,
+                id=item.id,
+                status=status.HTTP_404_NOT_FOUND,
+                detail="Product not found"
+            ))
+            continue
+
+        if item.category_id != None and item.category_id not in categories:
+            results.append(ProductBulkItemResponseDTO(
+                index=index,
+                id=item.id,
+                status=status.HTTP_404_NOT_FOUND,
+                detail="Category not found"
+            ))
+            continue
+
+        if item.id in updated_ids:
+            results.append(ProductBulkItemResponseDTO(
+                index=index,
+                id=item.id,
+                status=status.HTTP_409_CONFLICT,
+                detail="Product repeated in batch"
+            ))
+            continue
+
+        if names_taken.get(item.name, item.id) != item.id:
+            results.append(ProductBulkItemResponseDTO(
+                index=index,
+                id=item.id,
+                status=status.HTTP_409_CONFLICT,
+                detail="Product name already exists"
+            ))
+            continue
+
+        names_taken[item.name] = item.id
+        updated_ids.add(item.id)
+
+        products.append(item)
+        results.append(ProductBulkItemResponseDTO(
+            index=index,
+            id=item.id,
+            status=status.HTTP_202_ACCEPTED,
+            detail=None
+        ))
+
+    if products == []:
+        return ProductBulkResponseDTO(items=results)
+
+    try:
+        await update_many_repository(products)
+    except UniqueViolationError:
+        raise exception_error(
+            "Product name already exists",
+            status.HTTP_409_CONFLICT
+        )
+    except RecordNotFoundError:
         raise exception_error(
             "Product not found",
             status.HTTP_404_NOT_FOUND
         )
 
-    await destroy_repository(product_id)
+    await _invalidate_products(*[existing[product_id] for product_id in updated_ids])
+
+    for category_id in {product.category_id for product in products if product.category_id != None}:
+        await bump(f"category:{category_id}")
+
+    return ProductBulkResponseDTO(items=results)
+
+
+@observe_service
+async def bulk_destroy_service(
+    productBulkDeleteRequestDTO: ProductBulkDeleteRequestDTO
+) -> ProductBulkResponseDTO:
+    product_ids = productBulkDeleteRequestDTO.ids
+    _verify_batch_size(len(product_ids))
+
+    existing: Dict[str, ProductResponseDTO] = await find_by_ids_repository(
+        list(set(product_ids))
+    )
+
+    if existing != {}:
+        await destroy_many_repository(list(existing))
+
+    results: List[ProductBulkItemResponseDTO] = []
+    deleted_ids: Set[str] = set()
+
+    for index, product_id in enumerate(product_ids):
+        if product_id not in existing or product_id in deleted_ids:
+            results.append(ProductBulkItemResponseDTO(
+                index=index,
+                id=product_id,
+                status=status.HTTP_404_NOT_FOUND,
+                detail="Product not found"
+            ))
+            continue
+
+        deleted_ids.add(product_id)
+        results.append(ProductBulkItemResponseDTO(
+            index=index,
+            id=product_id,
+            status=status.HTTP_204_NO_CONTENT,
+            detail=None
+        ))
+
+    forget_filename("products", *existing)
+    await _invalidate_products(*existing.values())
+    await _release_banners(*(product.banner for product in existing.values()))
+
+    return ProductBulkResponseDTO(items=results)
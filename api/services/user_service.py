@@ -1,30 +1,42 @@
-from fastapi import status, UploadFile
+from fastapi import status, UploadFile, BackgroundTasks
 from prisma.models import Category
+from prisma.errors import UniqueViolationError
 
 from api.dtos.requests.user.create_request_dto import UserCreateRequestDTO
 from api.dtos.requests.user.update_request_dto import UserUpdateRequestDTO
 from api.dtos.requests.user.login_request_dto import UserLoginRequestDTO
+from api.dtos.requests.user.refresh_request_dto import RefreshTokenRequestDTO
 from api.dtos.responses.user.user_response_dto import (
     UserResponseDTO,
-    UserWithPassResponseDTO
+    UserWithPassResponseDTO,
+    TokenResponseDTO
 )
 from api.repositories.user_repository import (
     signup_repository,
     find_by_email,
+    find_token_version_repository,
     update_repository,
-    upload_repository
+    upload_repository,
+    write_avatar_variants_repository,
+    release_avatar_repository
 )
-from api.exception.http_exception import exception_error
+from api.exception.http_exception import exception_error, exception_error_credential
+from api.utils.images import generate_variants
+from api.utils.loaders import user_loader
 from api.utils.storage import (
-    verify_ext_file,
-    generate_hash_filename,
+    verify_image_file,
     upload_file,
     delete_file
 )
 
+from core.authentication.auth import create_tokens, refresh_version
+from core.authentication.revocation import revoke
 from core.authentication.security import generate_hash_password, verify_password
+from core.authentication.token_service import token_service
+from core.instrumentation import observe_service
 
 
+@observe_service
 async def signup_service(userCreateRequestDTO: UserCreateRequestDTO) -> UserResponseDTO:
     if userCreateRequestDTO.password != userCreateRequestDTO.confirm_password:
         raise exception_error(
@@ -32,25 +44,24 @@ async def signup_service(userCreateRequestDTO: UserCreateRequestDTO) -> UserResp
             status.HTTP_400_BAD_REQUEST
         )
 
-    email_exists: UserResponseDTO | None = await find_by_email(userCreateRequestDTO.email)
+    hash: str = await generate_hash_password(userCreateRequestDTO.password)
 
-    if email_exists != None:
+    try:
+        user: UserResponseDTO = await signup_repository(
+            userCreateRequestDTO,
+            hash
+        )
+    except UniqueViolationError:
         raise exception_error(
             "E-mail already exists",
             status.HTTP_409_CONFLICT
         )
 
-    hash: str = generate_hash_password(userCreateRequestDTO.password)
-
-    user: UserResponseDTO = await signup_repository(
-        userCreateRequestDTO,
-        hash
-    )
-
     return user
 
 
-async def signin_service(userLoginRequestDTO: UserLoginRequestDTO) -> UserResponseDTO:
+@observe_service
+async def signin_service(userLoginRequestDTO: UserLoginRequestDTO) -> TokenResponseDTO:
     user: UserWithPassResponseDTO | None = await find_by_email(userLoginRequestDTO.email)
 
     if user == None:
@@ -59,20 +70,38 @@ async def signin_service(userLoginRequestDTO: UserLoginRequestDTO) -> UserRespon
             status.HTTP_400_BAD_REQUEST
         )
 
-    if not verify_password(userLoginRequestDTO.password, user.password):
+    if not await verify_password(userLoginRequestDTO.password, user.password):
         raise exception_error(
             "Credencials invalid",
             status.HTTP_400_BAD_REQUEST
         )
 
-    return UserResponseDTO(
-        id=user.id,
-        name=user.name,
-        email=user.email,
-        avatar=user.avatar
+    return create_tokens(
+        UserResponseDTO(
+            id=user.id,
+            name=user.name,
+            email=user.email,
+            avatar=user.avatar
+        ),
+        user.token_version
     )
 
 
+@observe_service
+async def show_service(user_logged: UserResponseDTO) -> UserResponseDTO:
+    # the logged user comes from token claims, which may predate a change made elsewhere
+    user: UserResponseDTO | None = await user_loader().load(user_logged.id)
+
+    if user == None:
+        raise exception_error(
+            "User not found",
+            status.HTTP_404_NOT_FOUND
+        )
+
+    return user
+
+
+@observe_service
 async def update_service(
     user_id: str,
     userUpdateRequestDTO: UserUpdateRequestDTO
@@ -83,27 +112,100 @@ async def update_service(
             status.HTTP_400_BAD_REQUEST
         )
 
-    hash: str = generate_hash_password(userUpdateRequestDTO.password)
+    hash: str = await generate_hash_password(userUpdateRequestDTO.password)
+
+    user: UserResponseDTO | None = await update_repository(user_id, userUpdateRequestDTO, hash)
+
+    if user == None:
+        raise exception_error(
+            "User not found",
+            status.HTTP_404_NOT_FOUND
+        )
 
-    user: UserResponseDTO = await update_repository(user_id, userUpdateRequestDTO, hash)
     return user
 
 
-async def upload_service(user_logged: UserResponseDTO, avatar: UploadFile) -> UserResponseDTO:
-    avatar_verify: bool = verify_ext_file(avatar)
+@observe_service
+async def upload_service(
+    user_logged: UserResponseDTO,
+    avatar: UploadFile,
+    background_tasks: BackgroundTasks
+) -> UserResponseDTO:
+    avatar_type: str | None = await verify_image_file(avatar)
 
-    if avatar_verify == False:
+    if avatar_type == None:
         raise exception_error(
             "Type file invalid. Only select (.jpg, .jpeg, .png)",
             status.HTTP_406_NOT_ACCEPTABLE
         )
 
-    avatar_hash_name: str = generate_hash_filename(avatar)
+    old_avatar: str = (await show_service(user_logged)).avatar
+
+    avatar_hash_name, user = await upload_file(
+        avatar_type,
+        "users",
+        avatar,
+        lambda filename, verify: upload_repository(user_logged.id, filename, verify)
+    )
+
+    if user == None:
+        await release_avatar_repository(avatar_hash_name, lambda: delete_file(avatar_hash_name, "users"))
+        raise exception_error(
+            "User not found",
+            status.HTTP_404_NOT_FOUND
+        )
 
-    if user_logged.avatar != "":
-        delete_file(user_logged.avatar, "users")
+    background_tasks.add_task(
+        generate_variants,
+        avatar_hash_name,
+        "users",
+        lambda write: write_avatar_variants_repository(avatar_hash_name, write)
+    )
 
-    await upload_file(avatar_hash_name, "users", avatar)
-    user: UserResponseDTO = await upload_repository(user_logged.id, avatar_hash_name)
+    if old_avatar not in ("", avatar_hash_name):
+        await release_avatar_repository(old_avatar, lambda: delete_file(old_avatar, "users"))
 
     return user
+
+
+@observe_service
+async def refresh_service(refreshTokenRequestDTO: RefreshTokenRequestDTO) -> TokenResponseDTO:
+    payload: dict | None = token_service.verify(refreshTokenRequestDTO.refresh_token)
+
+    if payload == None or payload.get("type") != "refresh_token" or payload.get("jti") == None:
+        raise exception_error_credential()
+
+    # rotation: a refresh token is accepted once, a replayed one is rejected
+    if not await revoke(payload):
+        raise exception_error_credential()
+
+    token_service.forget(refreshTokenRequestDTO.refresh_token)
+    token_version: int | None = await find_token_version_repository(payload["sub"])
+
+    # a password change bumps the version and invalidates every older refresh token
+    if token_version == None or refresh_version(payload) != token_version:
+        raise exception_error_credential()
+
+    user: UserResponseDTO | None = await user_loader().load(payload["sub"])
+
+    if user == None:
+        raise exception_error_credential()
+
+    return create_tokens(user, token_version)
+
+
+@observe_service
+async def signout_service(
+    access_payload: dict,
+    refreshTokenRequestDTO: RefreshTokenRequestDTO | None
+) -> None:
+    await revoke(access_payload)
+
+    if refreshTokenRequestDTO == None:
+        return
+
+    payload: dict | None = token_service.verify(refreshTokenRequestDTO.refresh_token)
+
+    if payload != None and payload.get("sub") == access_payload["sub"] and payload.get("jti") != None:
+        await revoke(payload)
+        token_service.forget(refreshTokenRequestDTO.refresh_token)
@@ -0,0 +1,183 @@
+import asyncio
+import logging
+
+from bisect import bisect_right, insort
+from datetime import datetime
+from concurrent.futures import Future
+from typing import Dict, Iterable, List, Tuple
+
+from prisma.models import Category
+
+from api.dtos.responses.category.category_response_dto import (
+    CategoryResponseDTO,
+    CategoryPageResponseDTO
+)
+from api.repositories.category_repository import find_all_repository, trigger_exists_repository
+from api.utils.loaders import category_loader
+from api.utils.pagination import Position, encode_cursor
+
+from core.config import DATABASE_URL
+from core.metrics import CACHE_HITS, CACHE_MISSES
+from core.pg_listener import PostgresListener, listener_dsn
+
+logger = logging.getLogger(__name__)
+
+CHANNEL: str = "categories_changed"
+TRIGGER: str = "categories_notify_trigger"
+
+_categories: Dict[str, CategoryResponseDTO] = {}
+_created: Dict[str, datetime] = {}
+# (createdAt, id) of every category, sorted like KEYSET_ORDER
+_positions: List[Tuple[datetime, str]] = []
+_loaded: bool = False
+
+
+def _forget(category_id: str) -> None:
+    if category_id in _categories:
+        _positions.remove((_created.pop(category_id), category_id))
+        del _categories[category_id]
+
+
+def _category_response(category: Category) -> CategoryResponseDTO:
+    return CategoryResponseDTO.model_construct(
+        id=category.id,
+        name=category.name,
+        updated_at=category.updateAt
+    )
+
+
+def set_category(category: Category) -> None:
+    _forget(category.id)
+    _categories[category.id] = _category_response(category)
+    _created[category.id] = category.createdAt
+    insort(_positions, (category.createdAt, category.id))
+
+
+def forget_category(category_id: str) -> None:
+    _forget(category_id)
+
+
+def is_loaded() -> bool:
+    return _loaded
+
+
+async def load_categories() -> None:
+    global _loaded
+
+    categories: List[Category] = await find_all_repository()
+
+    _categories.clear()
+    _created.clear()
+    _positions.clear()
+
+    for category in categories:
+        set_category(category)
+
+    _loaded = True
+
+
+async def refresh_category(category_id: str) -> None:
+    category_loader().clear(category_id)
+    category: Category | None = await category_loader().load(category_id)
+
+    if category == None:
+        forget_category(category_id)
+    else:
+        set_category(category)
+
+
+async def resolve_categories(category_ids: Iterable[str]) -> List[CategoryResponseDTO | None]:
+    category_ids = list(category_ids)
+
+    # without notifications the map could hold deleted or renamed categories
+    if not _loaded:
+        categories: List[Category | None] = await category_loader().load_many(category_ids)
+        return [_category_response(category) if category != None else None for category in categories]
+
+    missing: List[str] = [category_id for category_id in set(category_ids) if category_id not in _categories]
+
+    if missing == []:
+        CACHE_HITS.labels("categories_map").inc()
+    else:
+        # created by another worker and not notified yet
+        CACHE_MISSES.labels("categories_map").inc()
+
+        for category in await category_loader().load_many(missing):
+            if category != None:
+                set_category(category)
+
+    return [_categories.get(category_id) for category_id in category_ids]
+
+
+def category_page(limit: int, position: Position | None) -> CategoryPageResponseDTO:
+    start: int = bisect_right(_positions, position) if position != None else 0
+    window: List[Tuple[datetime, str]] = _positions[start:start + limit + 1]
+    next_cursor: str | None = None
+
+    if len(window) > limit:
+        next_cursor = encode_cursor(*window[limit - 1])
+
+    return CategoryPageResponseDTO.model_construct(
+        items=[_categories[category_id] for _, category_id in window[:limit]],
+        next_cursor=next_cursor
+    )
+
+
+def _failed(future: Future) -> BaseException | None:
+    return None if future.cancelled() else future.exception()
+
+
+def _reload(loop: asyncio.AbstractEventLoop) -> None:
+    future: Future = asyncio.run_coroutine_threadsafe(load_categories(), loop)
+    future.add_done_callback(_reload_done)
+
+
+def _reload_done(future: Future) -> None:
+    global _loaded
+
+    error: BaseException | None = _failed(future)
+
+    if error != None:
+        # serve categories from the database until a later reload succeeds
+        _loaded = False
+        logger.warning("Reloading categories failed", exc_info=error)
+
+
+def _refresh(loop: asyncio.AbstractEventLoop, category_id: str) -> None:
+    if not _loaded:
+        _reload(loop)
+        return
+
+    future: Future = asyncio.run_coroutine_threadsafe(refresh_category(category_id), loop)
+    future.add_done_callback(lambda done: _refresh_done(loop, category_id, done))
+
+
+def _refresh_done(loop: asyncio.AbstractEventLoop, category_id: str, future: Future) -> None:
+    error: BaseException | None = _failed(future)
+
+    if error != None:
+        logger.warning("Refreshing category %s failed, reloading all", category_id, exc_info=error)
+        _reload(loop)
+
+
+async def listen_categories() -> PostgresListener | None:
+    if not await trigger_exists_repository(TRIGGER):
+        logger.warning(
+            "Trigger %s is missing (apply prisma/sql/category_notify.sql), "
+            "categories are read from the database",
+            TRIGGER
+        )
+        return None
+
+    await load_categories()
+    loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+
+    listener: PostgresListener = PostgresListener(
+        listener_dsn(DATABASE_URL),
+        CHANNEL,
+        on_notify=lambda category_id: _refresh(loop, category_id),
+        on_reconnect=lambda: _reload(loop)
+    )
+    listener.start()
+
+    return listener
@@ -0,0 +1,166 @@
+import hashlib
+import mimetypes
+
+from anyio import to_thread
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Tuple
+
+from fastapi import Request, Response, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
+
+from api.exception.http_exception import exception_error
+from api.utils.file_response import (
+    ByteRange,
+    RangeNotSatisfiable,
+    RangeFileResponse,
+    parse_range
+)
+from api.utils.storage_backends import storage_backend
+
+from core.config import FILE_CACHE_MAX_AGE
+
+
+def make_etag(*parts: Any) -> str:
+    digest: str = hashlib.blake2b(
+        "|".join(str(part) for part in parts).encode(),
+        digest_size=16
+    ).hexdigest()
+
+    return f'"{digest}"'
+
+
+def file_etag(filename: str, size: int, mtime: float) -> str:
+    return make_etag(filename, size, mtime)
+
+
+def conditional_headers(etag: str, last_modified: datetime | None = None) -> Dict[str, str]:
+    headers: Dict[str, str] = {"ETag": etag}
+
+    if last_modified != None:
+        headers["Last-Modified"] = format_datetime(
+            last_modified.astimezone(timezone.utc),
+            usegmt=True
+        )
+
+    return headers
+
+
+def is_not_modified(
+    request: Request,
+    etag: str,
+    last_modified: datetime | None = None
+) -> bool:
+    if_none_match: str | None = request.headers.get("if-none-match")
+
+    if if_none_match != None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+
+    if_modified_since: str | None = request.headers.get("if-modified-since")
+
+    if if_modified_since == None or last_modified == None:
+        return False
+
+    try:
+        since: datetime = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+    if since.tzinfo == None:
+        since = since.replace(tzinfo=timezone.utc)
+
+    return last_modified.replace(microsecond=0) <= since
+
+
+def not_modified_response(etag: str, last_modified: datetime | None = None) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=conditional_headers(etag, last_modified)
+    )
+
+
+def _range_applies(request: Request, headers: Dict[str, str]) -> bool:
+    if_range: str | None = request.headers.get("if-range")
+
+    return if_range == None or if_range in (headers["ETag"], headers["Last-Modified"])
+
+
+async def conditional_file_response(
+    request: Request,
+    key: str,
+    filename: str,
+    vary: str | None = None,
+    immutable: bool = False
+) -> Response:
+    stat: Tuple[int, float] | None = None
+
+    if filename != "":
+        stat = await to_thread.run_sync(storage_backend.stat, key)
+
+    # only a missing file is a 404, an empty one is served with Content-Length: 0
+    if stat == None:
+        raise exception_error(
+            "File not found",
+            status.HTTP_404_NOT_FOUND
+        )
+
+    size, mtime = stat
+    etag: str = make_etag(filename) if immutable else file_etag(filename, size, mtime)
+    last_modified: datetime = datetime.fromtimestamp(mtime, tz=timezone.utc)
+    headers: Dict[str, str] = conditional_headers(etag, last_modified)
+    headers["Cache-Control"] = (
+        f"private, max-age={FILE_CACHE_MAX_AGE}, immutable" if immutable else "private, no-cache"
+    )
+
+    if vary != None:
+        headers["Vary"] = vary
+
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    headers["Accept-Ranges"] = "bytes"
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    status_code: int = status.HTTP_200_OK
+    byte_range: ByteRange = (0, size - 1)
+
+    if _range_applies(request, headers):
+        try:
+            byte_range = parse_range(request.headers.get("range"), size) or byte_range
+        except RangeNotSatisfiable:
+            return Response(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                headers={**headers, "Content-Range": f"bytes */{size}"}
+            )
+
+        if byte_range != (0, size - 1):
+            status_code = status.HTTP_206_PARTIAL_CONTENT
+            headers["Content-Range"] = f"bytes {byte_range[0]}-{byte_range[1]}/{size}"
+
+    headers["Content-Length"] = str(byte_range[1] - byte_range[0] + 1)
+    media_type: str = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+    if size == 0:
+        return Response(status_code=status_code, headers=headers, media_type=media_type)
+
+    local_path: str | None = storage_backend.local_path(key)
+
+    if local_path != None:
+        return RangeFileResponse(
+            local_path,
+            byte_range,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type
+        )
+
+    if request.method == "HEAD":
+        return Response(status_code=status_code, headers=headers, media_type=media_type)
+
+    return StreamingResponse(
+        iterate_in_threadpool(storage_backend.iter_chunks(key, *byte_range)),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers
+    )
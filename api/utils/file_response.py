@@ -0,0 +1,122 @@
+import anyio
+
+from typing import Mapping, Tuple
+
+from starlette.background import BackgroundTask
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from core.config import UPLOAD_CHUNK_SIZE
+
+ByteRange = Tuple[int, int]
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header: str | None, size: int) -> ByteRange | None:
+    if header == None:
+        return None
+
+    unit, _, ranges = header.partition("=")
+
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+
+    first, sep, last = ranges.strip().partition("-")
+
+    if sep == "":
+        return None
+
+    try:
+        if first == "":
+            suffix: int = int(last)
+
+            if suffix <= 0 or size == 0:
+                raise RangeNotSatisfiable()
+
+            return max(size - suffix, 0), size - 1
+
+        start: int = int(first)
+        end: int = size - 1 if last == "" else int(last)
+    except ValueError:
+        return None
+
+    # a last byte before the first one makes the range invalid, so it is ignored (RFC 9110 14.1.1)
+    if last != "" and start > end:
+        return None
+
+    if start >= size:
+        raise RangeNotSatisfiable()
+
+    return start, min(end, size - 1)
+
+
+class RangeFileResponse(Response):
+    def __init__(
+        self,
+        path: str,
+        byte_range: ByteRange,
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+        media_type: str | None = None,
+        background: BackgroundTask | None = None
+    ) -> None:
+        self.path = path
+        self.start, self.end = byte_range
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = background
+        self.init_headers(headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers
+        })
+
+        count: int = self.end - self.start + 1
+        extensions: dict = scope.get("extensions") or {}
+
+        if scope["method"] == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+        elif "http.response.pathsend" in extensions and self.start == 0 and self.status_code == 200:
+            await send({"type": "http.response.pathsend", "path": self.path})
+        elif "http.response.zerocopysend" in extensions:
+            file = await anyio.to_thread.run_sync(open, self.path, "rb")
+
+            try:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file,
+                    "offset": self.start,
+                    "count": count,
+                    "more_body": False
+                })
+            finally:
+                await anyio.to_thread.run_sync(file.close)
+        else:
+            async with await anyio.open_file(self.path, "rb") as file:
+                await file.seek(self.start)
+                remaining: int = count
+
+                while remaining > 0:
+                    chunk: bytes = await file.read(min(UPLOAD_CHUNK_SIZE, remaining))
+
+                    if chunk == b"":
+                        break
+
+                    remaining -= len(chunk)
+                    await send({
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": remaining > 0
+                    })
+
+                if remaining > 0:
+                    await send({"type": "http.response.body", "body": b""})
+
+        if self.background != None:
+            await self.background()
@@ -0,0 +1,36 @@
+from typing import Awaitable, Callable
+
+from core.config import FILENAME_CACHE_SIZE, FILENAME_CACHE_TTL
+from core.metrics import CACHE_HITS, CACHE_MISSES
+from core.ttl_cache import TTLCache
+
+_filenames: TTLCache = TTLCache(FILENAME_CACHE_SIZE, FILENAME_CACHE_TTL)
+
+
+async def resolve_filename(
+    path: str,
+    record_id: str,
+    loader: Callable[[str], Awaitable[str | None]]
+) -> str | None:
+    filename: str | None = _filenames.get((path, record_id))
+
+    if filename != None:
+        CACHE_HITS.labels("filenames").inc()
+        return filename
+
+    CACHE_MISSES.labels("filenames").inc()
+    filename = await loader(record_id)
+
+    if filename != None:
+        _filenames.set((path, record_id), filename)
+
+    return filename
+
+
+def set_filename(path: str, record_id: str, filename: str) -> None:
+    _filenames.set((path, record_id), filename)
+
+
+def forget_filename(path: str, *record_ids: str) -> None:
+    for record_id in record_ids:
+        _filenames.delete((path, record_id))
@@ -0,0 +1,161 @@
+import os
+
+from anyio import to_thread
+from fastapi import UploadFile
+from PIL import Image, ImageOps
+from typing import Awaitable, Callable, Dict, List
+
+from api.utils.storage_backends import storage_backend, storage_key, staging_path
+from core.config import IMAGE_VARIANT_SIZES, IMAGE_WEBP_VARIANTS
+
+MAGIC_NUMBERS: Dict[bytes, str] = {
+    b"\x89PNG\r\n\x1a\n": "png",
+    b"\xff\xd8\xff": "jpg",
+}
+
+PIL_FORMATS: Dict[str, str] = {
+    "png": "PNG",
+    "jpg": "JPEG",
+    "jpeg": "JPEG",
+    "webp": "WEBP",
+}
+
+
+async def sniff_image_type(file: UploadFile) -> str | None:
+    head: bytes = await file.read(16)
+    await file.seek(0)
+
+    for magic, ext_file in MAGIC_NUMBERS.items():
+        if head.startswith(magic):
+            return ext_file
+
+    return None
+
+
+def variant_filename(filename: str, size: str, webp: bool = False) -> str:
+    stem, ext_file = os.path.splitext(filename)
+    return f"{stem}_{size}{'.webp' if webp else ext_file}"
+
+
+def variant_filenames(filename: str) -> List[str]:
+    filenames: List[str] = []
+
+    for size in IMAGE_VARIANT_SIZES:
+        filenames.append(variant_filename(filename, size))
+
+        if IMAGE_WEBP_VARIANTS:
+            filenames.append(variant_filename(filename, size, webp=True))
+
+    return filenames
+
+
+def _stage_variant(image: Image.Image, ext_file: str) -> str:
+    temp_path: str = staging_path()
+
+    try:
+        image.save(temp_path, format=PIL_FORMATS[ext_file], optimize=True)
+    except BaseException:
+        if os.path.isfile(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return temp_path
+
+
+def _discard_variants(staged: Dict[str, str]) -> None:
+    for temp_path in staged.values():
+        if os.path.isfile(temp_path):
+            os.remove(temp_path)
+
+
+def _put_variants(staged: Dict[str, str]) -> None:
+    for key, temp_path in staged.items():
+        storage_backend.put(key, temp_path)
+
+
+def _open_original(key: str) -> Image.Image:
+    local_path: str | None = storage_backend.local_path(key)
+
+    if local_path != None:
+        return Image.open(local_path)
+
+    temp_path: str = staging_path()
+
+    try:
+        storage_backend.fetch(key, temp_path)
+
+        with Image.open(temp_path) as image:
+            image.load()
+            return image.copy()
+    finally:
+        if os.path.isfile(temp_path):
+            os.remove(temp_path)
+
+
+def _variants_missing(filename: str, path: str) -> bool:
+    if not storage_backend.exists(storage_key(filename, path)):
+        return False
+
+    return not all(storage_backend.exists(storage_key(name, path)) for name in variant_filenames(filename))
+
+
+def _render_variants(filename: str, path: str) -> Dict[str, str]:
+    ext_file: str = os.path.splitext(filename)[1].lstrip(".").lower()
+    staged: Dict[str, str] = {}
+
+    try:
+        with _open_original(storage_key(filename, path)) as original:
+            # phone cameras keep the rotation in EXIF, which the saved variants would drop
+            upright: Image.Image = ImageOps.exif_transpose(original)
+
+            for size, max_side in IMAGE_VARIANT_SIZES.items():
+                image: Image.Image = upright.copy()
+                image.thumbnail((max_side, max_side))
+
+                staged[storage_key(variant_filename(filename, size), path)] = _stage_variant(image, ext_file)
+
+                if IMAGE_WEBP_VARIANTS:
+                    staged[storage_key(variant_filename(filename, size, webp=True), path)] = (
+                        _stage_variant(image, "webp")
+                    )
+    except BaseException:
+        _discard_variants(staged)
+        raise
+
+    return staged
+
+
+async def generate_variants(
+    filename: str,
+    path: str,
+    write_if_referenced: Callable[[Callable[[], Awaitable[None]]], Awaitable[bool]]
+) -> None:
+    if not await to_thread.run_sync(_variants_missing, filename, path):
+        return
+
+    staged: Dict[str, str] = await to_thread.run_sync(_render_variants, filename, path)
+
+    try:
+        # written under the file's lock (see locked_transaction) and only while a record
+        # still references it, so a concurrent release can not leave orphan variants
+        await write_if_referenced(lambda: to_thread.run_sync(_put_variants, staged))
+    finally:
+        await to_thread.run_sync(_discard_variants, staged)
+
+
+async def resolve_variant(filename: str, path: str, size: str, accept: str) -> str:
+    if filename == "" or size == "original":
+        return filename
+
+    candidates: List[str] = []
+
+    if IMAGE_WEBP_VARIANTS and "image/webp" in accept:
+        candidates.append(variant_filename(filename, size, webp=True))
+
+    candidates.append(variant_filename(filename, size))
+
+    for candidate in candidates:
+        if await to_thread.run_sync(storage_backend.exists, storage_key(candidate, path)):
+            return candidate
+
+    return filename
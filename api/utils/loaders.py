@@ -0,0 +1,15 @@
+from prisma.models import Category
+
+from api.dtos.responses.user.user_response_dto import UserResponseDTO
+from api.repositories.category_repository import find_many_repository as find_many_categories
+from api.repositories.user_repository import find_by_ids_repository as find_many_users
+
+from core.dataloader import DataLoader, get_loader
+
+
+def category_loader() -> DataLoader[str, Category]:
+    return get_loader("categories", find_many_categories)
+
+
+def user_loader() -> DataLoader[str, UserResponseDTO]:
+    return get_loader("users", find_many_users)
@@ -0,0 +1,76 @@
+import base64
+import binascii
+import json
+
+from datetime import datetime
+from typing import Tuple
+
+Position = Tuple[datetime | str, str]
+
+KEYSET_ORDER: list = [{"createdAt": "asc"}, {"id": "asc"}]
+
+DATETIME_FIELDS: Tuple[str, ...] = ("createdAt", "updateAt")
+
+
+def keyset_order(field: str = "createdAt", direction: str = "asc") -> list:
+    return [{field: direction}, {"id": direction}]
+
+
+def encode_cursor(value: datetime | str, id: str) -> str:
+    raw: bytes = json.dumps([
+        value.isoformat() if isinstance(value, datetime) else value,
+        id
+    ]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, field: str = "createdAt") -> Position | None:
+    try:
+        raw: bytes = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, id = json.loads(raw)
+
+        if field in DATETIME_FIELDS:
+            moment: datetime = datetime.fromisoformat(value)
+
+            # naive values can not be compared with the stored timestamps
+            if moment.tzinfo == None:
+                return None
+
+            return moment, str(id)
+
+        return str(value), str(id)
+    except (binascii.Error, ValueError, TypeError):
+        return None
+
+
+def keyset_where(
+    position: Position | None,
+    field: str = "createdAt",
+    direction: str = "asc"
+) -> dict | None:
+    if position == None:
+        return None
+
+    value, id = position
+    operator: str = "gt" if direction == "asc" else "lt"
+
+    return {
+        "OR": [
+            {field: {operator: value}},
+            {field: value, "id": {operator: id}}
+        ]
+    }
+
+
+def encode_offset_cursor(offset: int) -> str:
+    raw: bytes = json.dumps([offset]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_offset_cursor(cursor: str) -> int | None:
+    try:
+        raw: bytes = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        offset, = json.loads(raw)
+        return offset if isinstance(offset, int) and offset >= 0 else None
+    except (binascii.Error, ValueError, TypeError):
+        return None
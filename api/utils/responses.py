@@ -0,0 +1,17 @@
+from typing import Mapping
+
+from fastapi import Response, status
+from pydantic import BaseModel
+
+
+def dto_response(
+    dto: BaseModel,
+    status_code: int = status.HTTP_200_OK,
+    headers: Mapping[str, str] | None = None
+) -> Response:
+    return Response(
+        content=dto.model_dump_json(),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json"
+    )
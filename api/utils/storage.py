@@ -1,35 +1,120 @@
+import hashlib
 import os
+import time
 
-from fastapi import UploadFile
+from typing import Awaitable, Callable, Tuple, TypeVar
+
+from anyio import to_thread
+from fastapi import UploadFile, status
 from aiofile import async_open
-from uuid import uuid4
-from core.config import UPLOAD_DIR
+
+from api.exception.http_exception import exception_error
+from api.utils.images import sniff_image_type, variant_filenames
+from api.utils.storage_backends import storage_backend, storage_key, staging_path
+from core.config import UPLOAD_MAX_SIZE, UPLOAD_CHUNK_SIZE
+from core.metrics import UPLOAD_BYTES, UPLOAD_DEDUPLICATED, UPLOAD_SECONDS
+
+HASHED_FILENAME_PATTERN: str = r"^[0-9a-f]{64}(_[a-z]+)?\.(png|jpg|webp)$"
+UPLOAD_ATTEMPTS: int = 2
+
+T = TypeVar("T")
+
+
+class StoredFileMissing(Exception):
+    pass
 
 
-def verify_ext_file(file: UploadFile) -> bool:
-    ext_file: str = file.filename.split('.')[-1]
+async def verify_image_file(file: UploadFile) -> str | None:
+    ext_file: str = file.filename.split('.')[-1].lower()
 
     if ext_file != "png" and ext_file != "jpeg" and ext_file != "jpg":
-        return False
+        return None
+
+    return await sniff_image_type(file)
+
+
+def _remove_if_exists(file_path: str) -> None:
+    if os.path.isfile(file_path):
+        os.remove(file_path)
+
+
+async def _stage_file(ext_file: str, path: str, file: UploadFile) -> Tuple[str, str]:
+    temp_path: str = await to_thread.run_sync(staging_path)
+
+    start: float = time.perf_counter()
+    digest = hashlib.sha256()
+    size: int = 0
+
+    try:
+        async with async_open(temp_path, "wb") as afile:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+
+                if size > UPLOAD_MAX_SIZE:
+                    raise exception_error(
+                        f"File too large. Max {UPLOAD_MAX_SIZE} bytes",
+                        status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+                    )
+
+                digest.update(chunk)
+                await afile.write(chunk)
+    except BaseException:
+        await to_thread.run_sync(_remove_if_exists, temp_path)
+        raise
+
+    UPLOAD_SECONDS.labels(path).observe(time.perf_counter() - start)
+
+    return f"{digest.hexdigest()}.{ext_file}", temp_path
+
+
+async def _store_staged(filename: str, path: str, temp_path: str) -> None:
+    key: str = storage_key(filename, path)
+
+    if await to_thread.run_sync(storage_backend.exists, key):
+        UPLOAD_DEDUPLICATED.labels(path).inc()
+    else:
+        size: int = await to_thread.run_sync(os.path.getsize, temp_path)
+        await to_thread.run_sync(storage_backend.put, key, temp_path)
+        UPLOAD_BYTES.labels(path).inc(size)
+
+
+async def verify_stored(filename: str, path: str) -> None:
+    if not await to_thread.run_sync(storage_backend.exists, storage_key(filename, path)):
+        raise StoredFileMissing()
 
-    return True
 
+async def upload_file(
+    ext_file: str,
+    path: str,
+    file: UploadFile,
+    write_reference: Callable[[str, Callable[[], Awaitable[None]]], Awaitable[T]]
+) -> Tuple[str, T]:
+    # the file is stored outside any transaction; write_reference runs the given check
+    # under the file's lock (see locked_transaction), right before it writes the
+    # reference, so a release that deleted the file in between is noticed
+    for _ in range(UPLOAD_ATTEMPTS):
+        filename, temp_path = await _stage_file(ext_file, path, file)
 
-def generate_hash_filename(file: UploadFile) -> str:
-    ext_file: str = file.filename.split('.')[-1]
-    filename: str = f"{str(uuid4())}.{ext_file}"
+        try:
+            await _store_staged(filename, path, temp_path)
+        finally:
+            await to_thread.run_sync(_remove_if_exists, temp_path)
 
-    return filename
+        try:
+            return filename, await write_reference(filename, lambda: verify_stored(filename, path))
+        except StoredFileMissing:
+            await file.seek(0)
 
+    raise exception_error(
+        "File removed while uploading, try again",
+        status.HTTP_409_CONFLICT
+    )
 
-async def upload_file(filename: str, path: str, file: UploadFile) -> None:
-    if not os.path.exists(f"{UPLOAD_DIR}/{path}"):
-        os.makedirs(f"{UPLOAD_DIR}/{path}")
 
-    async with async_open(f"{UPLOAD_DIR}/{path}/{filename}", "wb") as afile:
-        await afile.write(file.file.read())
+def _remove_with_variants(filename: str, path: str) -> None:
+    for name in [filename, *variant_filenames(filename)]:
+        storage_backend.delete(storage_key(name, path))
 
 
-def delete_file(file_path: str, path: str) -> None:
-    if os.path.isfile(f"{UPLOAD_DIR}/{path}/{file_path}"):
-        os.remove(f"{UPLOAD_DIR}/{path}/{file_path}")
+async def delete_file(filename: str, path: str) -> None:
+    await to_thread.run_sync(_remove_with_variants, filename, path)
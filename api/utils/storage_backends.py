@@ -0,0 +1,151 @@
+import os
+import shutil
+
+from pathlib import Path
+from stat import S_ISREG
+from typing import Iterator, Protocol, Tuple
+from uuid import uuid4
+
+from core.config import (
+    UPLOAD_DIR,
+    STORAGE_BACKEND,
+    S3_BUCKET,
+    S3_ENDPOINT_URL,
+    S3_REGION,
+    UPLOAD_CHUNK_SIZE
+)
+
+
+STAGING_DIR: Path = UPLOAD_DIR / ".staging"
+
+
+def storage_key(filename: str, path: str) -> str:
+    return f"{path}/{filename}"
+
+
+def staging_path() -> str:
+    STAGING_DIR.mkdir(parents=True, exist_ok=True)
+    return f"{STAGING_DIR}/{uuid4()}.part"
+
+
+class StorageBackend(Protocol):
+    def exists(self, key: str) -> bool: ...
+
+    def put(self, key: str, source_path: str) -> None: ...
+
+    def fetch(self, key: str, dest_path: str) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+    def stat(self, key: str) -> Tuple[int, float] | None: ...
+
+    def iter_chunks(self, key: str, start: int = 0, end: int | None = None) -> Iterator[bytes]: ...
+
+    def local_path(self, key: str) -> str | None: ...
+
+
+class LocalStorageBackend:
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def _path(self, key: str) -> Path:
+        return self.root / key
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).is_file()
+
+    def put(self, key: str, source_path: str) -> None:
+        path: Path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(source_path, path)
+
+    def fetch(self, key: str, dest_path: str) -> None:
+        shutil.copyfile(self._path(key), dest_path)
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def stat(self, key: str) -> Tuple[int, float] | None:
+        try:
+            stat: os.stat_result = self._path(key).stat()
+        except FileNotFoundError:
+            return None
+
+        if not S_ISREG(stat.st_mode):
+            return None
+
+        return stat.st_size, stat.st_mtime
+
+    def iter_chunks(self, key: str, start: int = 0, end: int | None = None) -> Iterator[bytes]:
+        with open(self._path(key), "rb") as file:
+            file.seek(start)
+            remaining: float = float("inf") if end == None else end - start + 1
+
+            while remaining > 0 and (chunk := file.read(int(min(UPLOAD_CHUNK_SIZE, remaining)))):
+                remaining -= len(chunk)
+                yield chunk
+
+    def local_path(self, key: str) -> str | None:
+        return str(self._path(key))
+
+
+class S3StorageBackend:
+    def __init__(self, bucket: str, client) -> None:
+        self.bucket = bucket
+        self.client = client
+
+    def exists(self, key: str) -> bool:
+        return self.stat(key) != None
+
+    def put(self, key: str, source_path: str) -> None:
+        self.client.upload_file(source_path, self.bucket, key)
+        os.remove(source_path)
+
+    def fetch(self, key: str, dest_path: str) -> None:
+        self.client.download_file(self.bucket, key, dest_path)
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def stat(self, key: str) -> Tuple[int, float] | None:
+        from botocore.exceptions import ClientError
+
+        try:
+            head: dict = self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as error:
+            if error.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return None
+
+            raise
+
+        return head["ContentLength"], head["LastModified"].timestamp()
+
+    def iter_chunks(self, key: str, start: int = 0, end: int | None = None) -> Iterator[bytes]:
+        body = self.client.get_object(
+            Bucket=self.bucket,
+            Key=key,
+            Range=f"bytes={start}-{'' if end == None else end}"
+        )["Body"]
+
+        try:
+            yield from body.iter_chunks(UPLOAD_CHUNK_SIZE)
+        finally:
+            body.close()
+
+    def local_path(self, key: str) -> str | None:
+        return None
+
+
+def _create_backend() -> StorageBackend:
+    if STORAGE_BACKEND == "s3":
+        import boto3
+
+        return S3StorageBackend(
+            S3_BUCKET,
+            boto3.client("s3", endpoint_url=S3_ENDPOINT_URL, region_name=S3_REGION)
+        )
+
+    return LocalStorageBackend(UPLOAD_DIR)
+
+
+storage_backend: StorageBackend = _create_backend()
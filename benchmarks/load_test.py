@@ -0,0 +1,368 @@
+# Load test for the API's hot endpoints.
+#
+# Start a Postgres the API can reach (a local install is enough), push the
+# schema, then let the harness spawn the API with the rate limits lifted:
+#
+#   prisma db push
+#   python -m benchmarks.load_test --spawn --products 5000 --concurrency 32 \
+#       --requests 2000 --output benchmarks/results/current.json
+#
+# or point it at an API that is already running (rate limits must be raised
+# there, and RSS is only reported when --pid is given):
+#
+#   python -m benchmarks.load_test --base-url http://127.0.0.1:8000/api/v1 --pid 1234
+#
+# Compare against a previous run and fail when p95 regresses more than 10%:
+#
+#   python -m benchmarks.load_test --spawn --compare benchmarks/results/baseline.json
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+
+from PIL import Image
+
+from core.config import API_HOST, API_PORT, API_VERSION, BULK_MAX_SIZE
+
+PASSWORD: str = "benchmark-password"
+
+Scenario = Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered: List[float] = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def _children(pid: int) -> List[int]:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as children_file:
+            return [int(child) for child in children_file.read().split()]
+    except OSError:
+        return []
+
+
+def read_rss(pid: int | None) -> int | None:
+    if pid == None:
+        return None
+
+    total: int | None = None
+
+    for process_id in [pid, *_children(pid)]:
+        try:
+            with open(f"/proc/{process_id}/status") as status_file:
+                for line in status_file:
+                    if line.startswith("VmRSS:"):
+                        total = (total or 0) + int(line.split()[1]) * 1024
+        except OSError:
+            continue
+
+    return total
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def png_bytes() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (800, 600), (200, 120, 40)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def spawn_api(base_url: str, workers: int) -> subprocess.Popen:
+    env: Dict[str, str] = {
+        **os.environ,
+        "REQUEST_PER_MINUTES": "100000000",
+        "REQUEST_PER_MINUTES_AUTH": "100000000",
+    }
+    url = httpx.URL(base_url)
+
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--host", url.host,
+            "--port", str(url.port),
+            "--workers", str(workers),
+            "--log-level", "warning"
+        ],
+        env=env
+    )
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 30) -> None:
+    deadline: float = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        try:
+            await client.get("/docs")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.2)
+
+    raise RuntimeError("API did not start in time")
+
+
+async def seed(client: httpx.AsyncClient, users: int, categories: int, products: int) -> dict:
+    run: str = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+    emails: List[str] = []
+
+    for index in range(users):
+        email: str = f"bench-{run}-{index}@example.com"
+        response = await client.post("/users/signup", json={
+            "name": f"Benchmark {index}",
+            "email": email,
+            "password": PASSWORD,
+            "confirm_password": PASSWORD
+        })
+        response.raise_for_status()
+        emails.append(email)
+
+    token: str = (await client.post(
+        "/users/signin",
+        data={"username": emails[0], "password": PASSWORD}
+    )).json()["access_token"]
+    client.headers["Authorization"] = f"Bearer {token}"
+
+    category_ids: List[str] = []
+
+    for index in range(categories):
+        response = await client.post("/categories/", json={"name": f"bench-{run}-category-{index}"})
+        response.raise_for_status()
+        category_ids.append(response.json()["id"])
+
+    product_ids: List[str] = []
+
+    for start in range(0, products, BULK_MAX_SIZE):
+        response = await client.post("/products/bulk", json={"items": [
+            {
+                "name": f"bench-{run}-product-{index}",
+                "description": f"Benchmark product number {index}",
+                "category_id": category_ids[index % len(category_ids)]
+            }
+            for index in range(start, min(start + BULK_MAX_SIZE, products))
+        ]})
+        response.raise_for_status()
+        product_ids.extend(item["id"] for item in response.json()["items"] if item["id"] != None)
+
+    return {"emails": emails, "category_ids": category_ids, "product_ids": product_ids}
+
+
+def scenarios(data: dict, include_uploads: bool) -> Dict[str, Scenario]:
+    image: bytes = png_bytes()
+
+    selected: Dict[str, Scenario] = {
+        "signin": lambda client: client.post(
+            "/users/signin",
+            data={"username": random.choice(data["emails"]), "password": PASSWORD}
+        ),
+        "products_index": lambda client: client.get("/products/"),
+        "products_show": lambda client: client.get(f"/products/{random.choice(data['product_ids'])}"),
+        "categories_show": lambda client: client.get(
+            f"/categories/{random.choice(data['category_ids'])}"
+        ),
+    }
+
+    if include_uploads:
+        selected["products_upload"] = lambda client: client.patch(
+            f"/products/{random.choice(data['product_ids'])}",
+            files={"banner": ("banner.png", image, "image/png")}
+        )
+
+    return selected
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    total: int,
+    concurrency: int,
+    pid: int | None
+) -> dict:
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    errors: int = 0
+    remaining: int = total
+    rss_peak: int | None = read_rss(pid)
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+
+        while remaining > 0:
+            remaining -= 1
+            start: float = time.perf_counter()
+
+            try:
+                response = await scenario(client)
+                key: str = str(response.status_code)
+                errors += response.status_code >= 400
+            except httpx.HTTPError:
+                key = "transport_error"
+                errors += 1
+
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[key] = statuses.get(key, 0) + 1
+
+    async def sample_rss() -> None:
+        nonlocal rss_peak
+
+        while True:
+            rss: int | None = read_rss(pid)
+
+            if rss != None:
+                rss_peak = max(rss_peak or 0, rss)
+
+            await asyncio.sleep(0.25)
+
+    sampler: asyncio.Task = asyncio.create_task(sample_rss())
+    started: float = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed: float = time.perf_counter() - started
+    sampler.cancel()
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": statuses,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 3),
+            "p50": round(percentile(latencies, 0.50), 3),
+            "p95": round(percentile(latencies, 0.95), 3),
+            "p99": round(percentile(latencies, 0.99), 3),
+            "max": round(max(latencies), 3),
+        },
+        "rss_peak_bytes": rss_peak,
+    }
+
+
+def compare(results: dict, baseline_path: str, threshold: float) -> List[str]:
+    with open(baseline_path) as baseline_file:
+        baseline: dict = json.load(baseline_file)
+
+    regressions: List[str] = []
+
+    for name, current in results["scenarios"].items():
+        previous: dict | None = baseline.get("scenarios", {}).get(name)
+
+        if previous == None:
+            continue
+
+        before: float = previous["latency_ms"]["p95"]
+        after: float = current["latency_ms"]["p95"]
+
+        if before > 0 and (after - before) / before > threshold:
+            regressions.append(f"{name}: p95 {before:.2f}ms -> {after:.2f}ms")
+
+    return regressions
+
+
+async def main(args: argparse.Namespace) -> int:
+    process: subprocess.Popen | None = spawn_api(args.base_url, args.workers) if args.spawn else None
+    pid: int | None = process.pid if process != None else args.pid
+
+    try:
+        async with httpx.AsyncClient(
+            base_url=args.base_url,
+            timeout=args.timeout,
+            limits=httpx.Limits(max_connections=args.concurrency)
+        ) as client:
+            await wait_until_ready(client)
+            data: dict = await seed(client, args.users, args.categories, args.products)
+            results: dict = {
+                "meta": {
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                    "git_revision": git_revision(),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "base_url": args.base_url,
+                    "users": args.users,
+                    "categories": args.categories,
+                    "products": args.products,
+                    "requests": args.requests,
+                    "concurrency": args.concurrency,
+                    "workers": args.workers if args.spawn else None,
+                },
+                "scenarios": {},
+            }
+
+            for name, scenario in scenarios(data, not args.skip_uploads).items():
+                await run_scenario(client, scenario, min(args.requests, args.warmup), args.concurrency, None)
+                results["scenarios"][name] = await run_scenario(
+                    client,
+                    scenario,
+                    args.requests,
+                    args.concurrency,
+                    pid
+                )
+                summary: dict = results["scenarios"][name]
+                print(
+                    f"{name:<18} {summary['throughput_rps']:>9.1f} req/s  "
+                    f"p50 {summary['latency_ms']['p50']:>8.2f}ms  "
+                    f"p95 {summary['latency_ms']['p95']:>8.2f}ms  "
+                    f"p99 {summary['latency_ms']['p99']:>8.2f}ms  "
+                    f"errors {summary['errors']}"
+                )
+    finally:
+        if process != None:
+            process.terminate()
+            process.wait()
+
+    if args.output != None:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+
+    if args.compare != None:
+        regressions: List[str] = compare(results, args.compare, args.threshold)
+
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+
+        return 1 if regressions != [] else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the API's hot endpoints")
+    parser.add_argument("--base-url", default=f"http://{API_HOST}:{API_PORT}/api/{API_VERSION}")
+    parser.add_argument("--spawn", action="store_true", help="start uvicorn with rate limits lifted")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--pid", type=int, help="API process to sample RSS from")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=1000, help="requests per scenario")
+    parser.add_argument("--warmup", type=int, default=50, help="untimed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--skip-uploads", action="store_true")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="baseline JSON to compare p95 latencies against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed p95 regression ratio")
+
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,124 @@
+# Latency of GET /products/search against a seeded catalog.
+#
+#   prisma db push
+#   prisma db execute --file prisma/sql/product_search.sql --schema prisma/schema.prisma
+#   python -m benchmarks.search_benchmark --rows 1000000 --runs 50
+#
+# Seeding is skipped when the table already holds at least --rows products,
+# so later runs only measure.
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from typing import List
+
+from core.prisma_connection import connect, disconnect, prisma_db
+from api.repositories.product_repository import search_repository, search_terms, SEARCH_QUERY
+
+WORDS: List[str] = [
+    "coffee", "arabica", "espresso", "tea", "green", "black", "chocolate", "dark",
+    "milk", "organic", "juice", "orange", "apple", "grape", "water", "sparkling",
+    "cookie", "butter", "bread", "whole", "rice", "brown", "pasta", "tomato"
+]
+
+QUERIES: List[str] = ["coffee", "dark choc", "organic green tea", "spark", "product 4242", "zzz"]
+
+SEED_CATEGORY: str = """
+    INSERT INTO "categories" ("id", "name", "createdAt", "updateAt")
+    VALUES ('benchmark-category', 'Benchmark', now(), now())
+    ON CONFLICT DO NOTHING
+"""
+
+# productCount is kept by the product repository, so the raw insert adjusts it itself
+SEED_PRODUCTS: str = """
+    WITH inserted AS (
+    INSERT INTO "products" ("id", "name", "description", "categoryId", "createdAt", "updateAt")
+    SELECT
+        gen_random_uuid()::text,
+        'Product ' || i || ' ' || w[1 + i % array_length(w, 1)] || ' ' || w[1 + (i / 7) % array_length(w, 1)],
+        w[1 + (i / 3) % array_length(w, 1)] || ' ' || w[1 + (i / 11) % array_length(w, 1)] || ' '
+            || w[1 + (i / 13) % array_length(w, 1)] || ' for benchmark',
+        'benchmark-category',
+        now(),
+        now()
+    FROM generate_series($1::int, $2::int) AS i, (SELECT ARRAY[{words}] AS w) words
+    ON CONFLICT DO NOTHING
+    RETURNING "categoryId"
+    )
+    UPDATE "categories"
+    SET "productCount" = "productCount" + (SELECT count(*) FROM inserted)
+    WHERE "id" = 'benchmark-category'
+""".format(words=", ".join(f"'{word}'" for word in WORDS))
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered: List[float] = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def seed(rows: int, batch: int) -> None:
+    existing: int = await prisma_db.product.count()
+
+    if existing >= rows:
+        print(f"found {existing} products, skipping seed")
+        return
+
+    await prisma_db.execute_raw(SEED_CATEGORY)
+
+    for start in range(existing + 1, rows + 1, batch):
+        end: int = min(start + batch - 1, rows)
+        await prisma_db.execute_raw(SEED_PRODUCTS, start, end)
+        print(f"seeded {end}/{rows}")
+
+    await prisma_db.execute_raw('ANALYZE "products"')
+
+
+async def explain(text: str) -> str:
+    tsquery, prefix = search_terms(text)
+    plan: List[dict] = await prisma_db.query_raw(
+        "EXPLAIN " + SEARCH_QUERY.replace("$3", "20").replace("$4", "0"),
+        tsquery,
+        prefix
+    )
+
+    return " | ".join(
+        row["QUERY PLAN"].strip() for row in plan if "Index" in row["QUERY PLAN"]
+    ) or "no index used"
+
+
+async def main(rows: int, runs: int, limit: int, batch: int) -> None:
+    await connect()
+
+    try:
+        await seed(rows, batch)
+        print(f"{'query':<20} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'hits':>5}  plan")
+
+        for text in QUERIES:
+            samples: List[float] = []
+            hits: int = 0
+
+            for _ in range(runs):
+                start: float = time.perf_counter()
+                page = await search_repository(text, limit, 0)
+                samples.append((time.perf_counter() - start) * 1000)
+                hits = len(page.items)
+
+            print(
+                f"{text:<20} {statistics.median(samples):>8.2f} {percentile(samples, 0.95):>8.2f} "
+                f"{percentile(samples, 0.99):>8.2f} {hits:>5}  {await explain(text)}"
+            )
+    finally:
+        await disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark product search latency")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=50_000)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.rows, args.runs, args.limit, args.batch))
@@ -0,0 +1,99 @@
+# Cost of turning a page of products into response bytes.
+#
+#   python -m benchmarks.serialization_benchmark --products 10000 --runs 20
+#
+# Compares FastAPI's default path (revalidate against response_model, then
+# jsonable_encoder + json.dumps), the same with ORJSONResponse,
+# and dto_response, which dumps the DTO straight through pydantic-core.
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List
+
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from api.dtos.responses.product.product_response_dto import (
+    CategoryResponseDTO,
+    ProductResponseDTO,
+    ProductPageResponseDTO
+)
+from api.utils.responses import dto_response
+
+
+def build_page(products: int) -> ProductPageResponseDTO:
+    now: datetime = datetime.now(timezone.utc)
+    category = CategoryResponseDTO.model_construct(id="category-id", name="Benchmark", updated_at=now)
+
+    return ProductPageResponseDTO.model_construct(
+        items=[
+            ProductResponseDTO.model_construct(
+                id=f"product-{index}",
+                name=f"Product {index}",
+                description=f"Benchmark product number {index}",
+                banner=f"{index:064x}.png",
+                updated_at=now,
+                category=category
+            )
+            for index in range(products)
+        ],
+        next_cursor=None
+    )
+
+
+async def measure(render: Callable[[], Awaitable[Response]], runs: int) -> List[float]:
+    samples: List[float] = []
+
+    for _ in range(runs):
+        start: float = time.perf_counter()
+        await render()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    return samples
+
+
+async def main(products: int, runs: int) -> None:
+    page: ProductPageResponseDTO = build_page(products)
+    field = create_response_field(name="Response_index", type_=ProductPageResponseDTO)
+
+    # every path runs inside the same event loop, so only serialization is timed
+    async def validated() -> dict:
+        return await serialize_response(field=field, response_content=page, is_coroutine=True)
+
+    async def fastapi_default() -> Response:
+        return JSONResponse(await validated())
+
+    async def orjson_response() -> Response:
+        return ORJSONResponse(await validated())
+
+    async def direct() -> Response:
+        return dto_response(page)
+
+    renderers: dict = {
+        "fastapi default": fastapi_default,
+        "orjson response": orjson_response,
+        "dto_response": direct,
+    }
+
+    print(f"{'path':<16} {'p50 ms':>8} {'min ms':>8} {'bytes':>9}")
+
+    for name, render in renderers.items():
+        samples: List[float] = await measure(render, runs)
+        print(
+            f"{name:<16} {statistics.median(samples):>8.2f} {min(samples):>8.2f} "
+            f"{len((await render()).body):>9}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark response serialization")
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.products, args.runs))
@@ -1,36 +1,64 @@
 from fastapi.security import OAuth2PasswordBearer
-from core.config import (
-    API_VERSION,
-    JWT_SECRET,
-    ALGORITHM,
-    ACCESS_TOKEN_EXPIRE_MINUTES
-)
-from datetime import datetime, timedelta
-from pytz import timezone
-from jose import jwt
+from api.dtos.responses.user.user_response_dto import UserResponseDTO, TokenResponseDTO
+from core.config import API_VERSION, ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_MINUTES
+from core.authentication.token_service import token_service
+from datetime import timedelta
+from uuid import uuid4
 
 oauth2_schema = OAuth2PasswordBearer(
     tokenUrl=f"{API_VERSION}/users/signin"
 )
 
+USER_CLAIMS = ("name", "email", "avatar")
 
-def _create_token(type_token: str, time_life: timedelta, sub: str) -> str:
-    payload = {}
-
-    sp = timezone("America/Sao_Paulo")
-    expire_in = datetime.now(tz=sp) + time_life
-
-    payload["type"] = type_token
-    payload["exp"] = expire_in
-    payload["iat"] = datetime.now(tz=sp)
-    payload["sub"] = str(sub)
 
-    return jwt.encode(payload, key=JWT_SECRET, algorithm=ALGORITHM)
+def _create_token(type_token: str, time_life: timedelta, sub: str, **claims: str) -> str:
+    return token_service.sign(
+        {"type": type_token, "sub": str(sub), "jti": uuid4().hex, **claims},
+        time_life
+    )
 
 
-def create_token_access(sub: str) -> str:
+def create_token_access(user: UserResponseDTO) -> str:
     return _create_token(
         type_token="access_token",
         time_life=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
-        sub=sub
+        sub=user.id,
+        name=user.name,
+        email=user.email,
+        avatar=user.avatar
+    )
+
+
+def create_token_refresh(sub: str, token_version: int) -> str:
+    return _create_token(
+        type_token="refresh_token",
+        time_life=timedelta(minutes=REFRESH_TOKEN_EXPIRE_MINUTES),
+        sub=sub,
+        ver=str(token_version)
+    )
+
+
+def refresh_version(payload: dict) -> int:
+    # refresh tokens issued before token versions existed belong to version 0
+    return int(payload.get("ver", 0))
+
+
+def create_tokens(user: UserResponseDTO, token_version: int) -> TokenResponseDTO:
+    return TokenResponseDTO(
+        access_token=create_token_access(user),
+        refresh_token=create_token_refresh(user.id, token_version),
+        token_type="bearer"
+    )
+
+
+def user_from_claims(payload: dict) -> UserResponseDTO | None:
+    if payload.get("type") != "access_token" or any(claim not in payload for claim in USER_CLAIMS):
+        return None
+
+    return UserResponseDTO.model_construct(
+        id=payload["sub"],
+        name=payload["name"],
+        email=payload["email"],
+        avatar=payload["avatar"]
     )
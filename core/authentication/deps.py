@@ -1,35 +1,34 @@
 from fastapi import Depends
-from jose import jwt, JWTError
 
 from api.dtos.responses.user.user_response_dto import UserResponseDTO
 from api.exception.http_exception import exception_error_credential
-from api.repositories.user_repository import find_by_id
 
-from core.authentication.auth import oauth2_schema
-from core.config import JWT_SECRET, ALGORITHM
+from core.authentication.auth import oauth2_schema, user_from_claims
+from core.authentication.revocation import is_revoked
+from core.authentication.token_service import token_service
+from core.authentication.user_cache import get_user
 
 
-async def get_current_user(
+async def get_current_claims(
     token: str = Depends(oauth2_schema)
-) -> UserResponseDTO:
-    try:
-        payload = jwt.decode(
-            token,
-            JWT_SECRET,
-            algorithms=[ALGORITHM],
-            options={"verify_aud": False}
-        )
+) -> dict:
+    payload: dict | None = token_service.verify(token)
+
+    if payload == None or payload.get("sub") == None or payload.get("jti") == None:
+        raise exception_error_credential()
 
-        username: str = payload.get("sub")
+    if await is_revoked(payload):
+        raise exception_error_credential()
 
-        if username is None:
-            raise exception_error_credential()
+    return payload
 
-        user: UserResponseDTO | None = await find_by_id(username)
 
-        if user == None:
-            raise exception_error_credential()
+async def get_current_user(
+    payload: dict = Depends(get_current_claims)
+) -> UserResponseDTO:
+    user: UserResponseDTO | None = user_from_claims(payload)
 
-        return user
-    except JWTError:
+    if user == None:
         raise exception_error_credential()
+
+    return get_user(user.id) or user
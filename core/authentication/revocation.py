@@ -0,0 +1,78 @@
+import time
+
+from typing import Any, Dict, Protocol
+
+from core.config import REVOCATION_BACKEND, REVOCATION_URL, REFRESH_TOKEN_EXPIRE_MINUTES
+
+
+class RevocationStore(Protocol):
+    async def add(self, jti: str, expire_at: int) -> bool: ...
+
+    async def contains(self, jti: str) -> bool: ...
+
+
+class MemoryRevocationStore:
+    def __init__(self) -> None:
+        self._revoked: Dict[str, float] = {}
+        self._purge_at: int = 1024
+
+    def _purge(self) -> None:
+        now: float = time.time()
+        self._revoked = {jti: expire_at for jti, expire_at in self._revoked.items() if expire_at > now}
+        self._purge_at = max(1024, len(self._revoked) * 2)
+
+    async def add(self, jti: str, expire_at: int) -> bool:
+        if await self.contains(jti):
+            return False
+
+        self._revoked[jti] = expire_at
+
+        if len(self._revoked) >= self._purge_at:
+            self._purge()
+
+        return True
+
+    async def contains(self, jti: str) -> bool:
+        expire_at: float | None = self._revoked.get(jti)
+
+        if expire_at == None:
+            return False
+
+        if expire_at <= time.time():
+            del self._revoked[jti]
+            return False
+
+        return True
+
+
+class RedisRevocationStore:
+    def __init__(self, client: Any) -> None:
+        self.client = client
+
+    async def add(self, jti: str, expire_at: int) -> bool:
+        return bool(await self.client.set(f"revoked:{jti}", 1, exat=expire_at, nx=True))
+
+    async def contains(self, jti: str) -> bool:
+        return await self.client.exists(f"revoked:{jti}") > 0
+
+
+def _create_store() -> RevocationStore:
+    if REVOCATION_BACKEND == "redis":
+        from redis.asyncio import Redis
+
+        return RedisRevocationStore(Redis.from_url(REVOCATION_URL))
+
+    return MemoryRevocationStore()
+
+
+revocation_store: RevocationStore = _create_store()
+
+
+async def revoke(payload: dict) -> bool:
+    expire_at: int = int(payload.get("exp") or time.time() + REFRESH_TOKEN_EXPIRE_MINUTES * 60)
+
+    return await revocation_store.add(payload["jti"], expire_at)
+
+
+async def is_revoked(payload: dict) -> bool:
+    return await revocation_store.contains(payload["jti"])
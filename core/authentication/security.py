@@ -1,12 +1,57 @@
+import asyncio
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
 from passlib.context import CryptContext
 
+from api.exception.http_exception import exception_error_unavailable
+from core.config import HASH_WORKERS, HASH_QUEUE_LIMIT
+from core.metrics import PASSWORD_HASH_SECONDS
+
 
 CRIPTO = CryptContext(schemes=['bcrypt'], deprecated='auto')
 
+_executor: ThreadPoolExecutor = ThreadPoolExecutor(
+    max_workers=HASH_WORKERS,
+    thread_name_prefix="bcrypt"
+)
+_pending: int = 0
+
+
+def _timed(operation: str, func: Callable[..., Any], *args: Any) -> Any:
+    start: float = time.perf_counter()
+
+    try:
+        return func(*args)
+    finally:
+        PASSWORD_HASH_SECONDS.labels(operation).observe(time.perf_counter() - start)
+
+
+async def _run(operation: str, func: Callable[..., Any], *args: Any) -> Any:
+    global _pending
+
+    if _pending >= HASH_WORKERS + HASH_QUEUE_LIMIT:
+        raise exception_error_unavailable()
+
+    _pending += 1
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            _executor,
+            _timed,
+            operation,
+            func,
+            *args
+        )
+    finally:
+        _pending -= 1
+
 
-def verify_password(password: str, hash_password: str) -> bool:
-    return CRIPTO.verify(password, hash_password)
+async def verify_password(password: str, hash_password: str) -> bool:
+    return await _run("verify", CRIPTO.verify, password, hash_password)
 
 
-def generate_hash_password(password: str) -> str:
-    return CRIPTO.hash(password)
+async def generate_hash_password(password: str) -> str:
+    return await _run("hash", CRIPTO.hash, password)
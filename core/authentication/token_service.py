@@ -0,0 +1,103 @@
+import time
+
+from datetime import timedelta
+from pathlib import Path
+
+from jose import jwk, jwt, JWTError
+from jose.backends.base import Key
+
+from core.config import (
+    JWT_SECRET,
+    ALGORITHM,
+    JWT_PRIVATE_KEY_FILE,
+    JWT_PUBLIC_KEY_FILE,
+    AUTH_CACHE_SIZE,
+    AUTH_CACHE_TTL
+)
+from core.metrics import CACHE_HITS, CACHE_MISSES
+from core.ttl_cache import TTLCache
+
+
+class TokenService:
+    def __init__(
+        self,
+        algorithm: str,
+        signing_key: str | None,
+        verifying_key: str | None,
+        cache_size: int,
+        cache_ttl: float
+    ) -> None:
+        self.algorithm = algorithm
+        self._signing_key: Key | None = None
+        self._verifying_key: Key
+
+        if signing_key != None:
+            self._signing_key = jwk.construct(signing_key, algorithm)
+
+        if verifying_key != None:
+            self._verifying_key = jwk.construct(verifying_key, algorithm)
+        elif self._signing_key != None:
+            self._verifying_key = self._signing_key.public_key()
+        else:
+            raise ValueError(f"No key configured to verify {algorithm} tokens")
+
+        self._verified: TTLCache = TTLCache(cache_size, cache_ttl)
+
+    def sign(self, claims: dict, time_life: timedelta) -> str:
+        if self._signing_key == None:
+            raise RuntimeError(f"No private key configured to sign {self.algorithm} tokens")
+
+        now: int = int(time.time())
+
+        return jwt.encode(
+            {**claims, "iat": now, "exp": now + int(time_life.total_seconds())},
+            self._signing_key,
+            algorithm=self.algorithm
+        )
+
+    def verify(self, token: str) -> dict | None:
+        payload: dict | None = self._verified.get(token)
+
+        if payload != None:
+            CACHE_HITS.labels("auth_claims").inc()
+            return payload
+
+        CACHE_MISSES.labels("auth_claims").inc()
+
+        try:
+            payload = jwt.decode(
+                token,
+                self._verifying_key,
+                algorithms=[self.algorithm],
+                options={"verify_aud": False}
+            )
+        except JWTError:
+            return None
+
+        exp: float | None = payload.get("exp")
+        self._verified.set(token, payload, None if exp == None else exp - time.time())
+
+        return payload
+
+    def forget(self, token: str) -> None:
+        self._verified.delete(token)
+
+
+def _read_key(path: str) -> str | None:
+    return Path(path).read_text() if path != "" else None
+
+
+def _create_token_service() -> TokenService:
+    if ALGORITHM.startswith("HS"):
+        return TokenService(ALGORITHM, JWT_SECRET, JWT_SECRET, AUTH_CACHE_SIZE, AUTH_CACHE_TTL)
+
+    return TokenService(
+        ALGORITHM,
+        _read_key(JWT_PRIVATE_KEY_FILE),
+        _read_key(JWT_PUBLIC_KEY_FILE),
+        AUTH_CACHE_SIZE,
+        AUTH_CACHE_TTL
+    )
+
+
+token_service: TokenService = _create_token_service()
@@ -0,0 +1,24 @@
+from api.dtos.responses.user.user_response_dto import UserResponseDTO
+
+from core.config import AUTH_CACHE_SIZE, ACCESS_TOKEN_EXPIRE_MINUTES
+from core.metrics import CACHE_HITS, CACHE_MISSES
+from core.ttl_cache import TTLCache
+
+# Access tokens carry the user in their claims; users changed by this process
+# are kept here until every token issued before the change has expired.
+_users_cache: TTLCache = TTLCache(AUTH_CACHE_SIZE, ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+
+def get_user(user_id: str) -> UserResponseDTO | None:
+    user: UserResponseDTO | None = _users_cache.get(user_id)
+
+    if user == None:
+        CACHE_MISSES.labels("auth_user").inc()
+    else:
+        CACHE_HITS.labels("auth_user").inc()
+
+    return user
+
+
+def set_user(user: UserResponseDTO) -> None:
+    _users_cache.set(user.id, user)
@@ -0,0 +1,120 @@
+import asyncio
+
+from typing import Any, Awaitable, Callable, Dict, Protocol, Type, TypeVar
+
+from pydantic import BaseModel
+
+from core.config import CACHE_BACKEND, CACHE_URL, CACHE_TTL, CACHE_MAX_ENTRIES
+from core.metrics import CACHE_HITS, CACHE_MISSES
+from core.ttl_cache import TTLCache
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class CacheBackend(Protocol):
+    async def get(self, key: str) -> str | bytes | None: ...
+
+    async def set(self, key: str, value: str, ex: int | None = None) -> Any: ...
+
+    async def delete(self, *keys: str) -> Any: ...
+
+    async def incr(self, key: str) -> int: ...
+
+
+class MemoryCacheBackend:
+    def __init__(self, maxsize: int) -> None:
+        self._entries: TTLCache = TTLCache(maxsize, float("inf"))
+        self._counters: Dict[str, int] = {}
+
+    async def get(self, key: str) -> str | None:
+        if key in self._counters:
+            return str(self._counters[key])
+
+        return self._entries.get(key)
+
+    async def set(self, key: str, value: str, ex: int | None = None) -> None:
+        self._entries.set(key, value, ex)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.delete(key)
+            self._counters.pop(key, None)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+
+def _create_backend() -> CacheBackend:
+    if CACHE_BACKEND == "redis":
+        from redis.asyncio import Redis
+
+        return Redis.from_url(CACHE_URL, decode_responses=True)
+
+    return MemoryCacheBackend(CACHE_MAX_ENTRIES)
+
+
+cache_backend: CacheBackend = _create_backend()
+_in_flight: Dict[str, asyncio.Future] = {}
+_LEADER_CANCELLED: object = object()
+
+
+async def versioned_key(namespace: str, *parts: Any) -> str:
+    version: str | bytes | None = await cache_backend.get(f"{namespace}:version")
+
+    if isinstance(version, bytes):
+        version = version.decode()
+
+    return f"{namespace}:v{version or 0}:" + ":".join(str(part) for part in parts)
+
+
+async def bump(namespace: str) -> None:
+    await cache_backend.incr(f"{namespace}:version")
+
+
+async def invalidate(*keys: str) -> None:
+    await cache_backend.delete(*keys)
+
+
+async def get_or_load(
+    key: str,
+    model: Type[ModelT],
+    loader: Callable[[], Awaitable[ModelT | None]]
+) -> ModelT | None:
+    cached: str | bytes | None = await cache_backend.get(key)
+
+    if cached != None:
+        CACHE_HITS.labels(key.split(":", 1)[0]).inc()
+        return model.model_validate_json(cached)
+
+    CACHE_MISSES.labels(key.split(":", 1)[0]).inc()
+
+    if key in _in_flight:
+        value: Any = await asyncio.shield(_in_flight[key])
+
+        # the leader was cancelled before loading, one of the followers takes over
+        if value is _LEADER_CANCELLED:
+            return await get_or_load(key, model, loader)
+
+        return value
+
+    future: asyncio.Future = asyncio.get_running_loop().create_future()
+    _in_flight[key] = future
+
+    try:
+        value: ModelT | None = await loader()
+
+        if value != None:
+            await cache_backend.set(key, value.model_dump_json(), ex=CACHE_TTL)
+
+        future.set_result(value)
+        return value
+    except asyncio.CancelledError:
+        future.set_result(_LEADER_CANCELLED)
+        raise
+    except Exception as error:
+        future.set_exception(error)
+        future.exception()
+        raise
+    finally:
+        del _in_flight[key]
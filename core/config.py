@@ -9,13 +9,58 @@ API_HOST: str = os.getenv("API_HOST")
 API_PORT: int = int(os.getenv("API_PORT"))
 API_VERSION: str = os.getenv("API_VERSION")
 
-SIZE_PER_PAGE: int = os.getenv("SIZE_PER_PAGE")
+DATABASE_URL: str = os.getenv("DATABASE_URL")
+DATABASE_CONNECTION_LIMIT: int = int(os.getenv("DATABASE_CONNECTION_LIMIT", 10))
+DATABASE_POOL_TIMEOUT: int = int(os.getenv("DATABASE_POOL_TIMEOUT", 10))
+DATABASE_CONNECT_TIMEOUT: int = int(os.getenv("DATABASE_CONNECT_TIMEOUT", 10))
+DATABASE_SHUTDOWN_TIMEOUT: int = int(os.getenv("DATABASE_SHUTDOWN_TIMEOUT", 10))
+PRISMA_METRICS_INTERVAL: int = int(os.getenv("PRISMA_METRICS_INTERVAL", 15))
+CATEGORY_LISTEN_ENABLED: bool = os.getenv("CATEGORY_LISTEN_ENABLED", "true").lower() == "true"
 
-REQUEST_PER_MINUTES: int = os.getenv("REQUEST_PER_MINUTES")
-REQUEST_PER_MINUTES_AUTH: int = os.getenv("REQUEST_PER_MINUTES_AUTH")
+SIZE_PER_PAGE: int = int(os.getenv("SIZE_PER_PAGE", 20))
+EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", 500))
+BULK_MAX_SIZE: int = int(os.getenv("BULK_MAX_SIZE", 1000))
+
+REQUEST_PER_MINUTES: int = int(os.getenv("REQUEST_PER_MINUTES", 100))
+REQUEST_PER_MINUTES_AUTH: int = int(os.getenv("REQUEST_PER_MINUTES_AUTH", 5))
+RATE_LIMIT_STORAGE_URI: str = os.getenv("RATE_LIMIT_STORAGE_URI", "memory://")
+RATE_LIMIT_STRATEGY: str = os.getenv("RATE_LIMIT_STRATEGY", "moving-window")
+
+CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory")
+CACHE_URL: str = os.getenv("CACHE_URL", "redis://localhost:6379/0")
+CACHE_TTL: int = int(os.getenv("CACHE_TTL", 60))
+CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", 10000))
 
 JWT_SECRET: str = os.getenv("JWT_SECRET")
 ALGORITHM: str = os.getenv("ALGORITHM")
-ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
+JWT_PRIVATE_KEY_FILE: str = os.getenv("JWT_PRIVATE_KEY_FILE", "")
+JWT_PUBLIC_KEY_FILE: str = os.getenv("JWT_PUBLIC_KEY_FILE", "")
+ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 15))
+REFRESH_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_MINUTES", 60 * 24 * 7))
+REVOCATION_BACKEND: str = os.getenv("REVOCATION_BACKEND", "memory")
+REVOCATION_URL: str = os.getenv("REVOCATION_URL", CACHE_URL)
+
+HASH_WORKERS: int = int(os.getenv("HASH_WORKERS", 4))
+HASH_QUEUE_LIMIT: int = int(os.getenv("HASH_QUEUE_LIMIT", 32))
+
+AUTH_CACHE_SIZE: int = int(os.getenv("AUTH_CACHE_SIZE", 10000))
+AUTH_CACHE_TTL: int = int(os.getenv("AUTH_CACHE_TTL", 60))
 
 UPLOAD_DIR: Path = Path(os.getenv("UPLOAD_DIR"))
+UPLOAD_MAX_SIZE: int = int(os.getenv("UPLOAD_MAX_SIZE", 5 * 1024 * 1024))
+UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", 64 * 1024))
+FILENAME_CACHE_SIZE: int = int(os.getenv("FILENAME_CACHE_SIZE", 10000))
+FILENAME_CACHE_TTL: int = int(os.getenv("FILENAME_CACHE_TTL", 300))
+FILE_CACHE_MAX_AGE: int = int(os.getenv("FILE_CACHE_MAX_AGE", 60 * 60 * 24 * 365))
+
+STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "local")
+S3_BUCKET: str = os.getenv("S3_BUCKET", "stock-api")
+S3_ENDPOINT_URL: str | None = os.getenv("S3_ENDPOINT_URL") or None
+S3_REGION: str | None = os.getenv("S3_REGION") or None
+STORAGE_LOCK_TIMEOUT: int = int(os.getenv("STORAGE_LOCK_TIMEOUT", 30))
+
+IMAGE_VARIANT_SIZES: dict = {
+    "thumb": int(os.getenv("IMAGE_THUMB_SIZE", 160)),
+    "medium": int(os.getenv("IMAGE_MEDIUM_SIZE", 640)),
+}
+IMAGE_WEBP_VARIANTS: bool = os.getenv("IMAGE_WEBP_VARIANTS", "true").lower() == "true"
@@ -0,0 +1,95 @@
+import asyncio
+
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Iterable, List, Set, TypeVar
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+KeyT = TypeVar("KeyT", bound=Hashable)
+ValueT = TypeVar("ValueT")
+
+BatchLoad = Callable[[List[KeyT]], Awaitable[Dict[KeyT, ValueT]]]
+
+
+# Loads issued in the same loop iteration are coalesced into one batch_load call,
+# and every resolved key is remembered for the lifetime of the loader (one request).
+class DataLoader(Generic[KeyT, ValueT]):
+    def __init__(self, batch_load: BatchLoad) -> None:
+        self.batch_load = batch_load
+        self._futures: Dict[KeyT, asyncio.Future] = {}
+        self._queue: List[KeyT] = []
+        self._dispatching: Set[asyncio.Task] = set()
+
+    async def load(self, key: KeyT) -> ValueT | None:
+        future: asyncio.Future | None = self._futures.get(key)
+
+        if future == None:
+            loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._futures[key] = future
+            self._queue.append(key)
+
+            if len(self._queue) == 1:
+                loop.call_soon(self._schedule)
+
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[KeyT]) -> List[ValueT | None]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def clear(self, *keys: KeyT) -> None:
+        for key in keys:
+            if key in self._futures and self._futures[key].done():
+                del self._futures[key]
+
+    def _schedule(self) -> None:
+        task: asyncio.Task = asyncio.ensure_future(self._dispatch())
+        self._dispatching.add(task)
+        task.add_done_callback(self._dispatching.discard)
+
+    async def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+
+        try:
+            values: Dict[KeyT, ValueT] = await self.batch_load(keys)
+        except Exception as error:
+            for key in keys:
+                future: asyncio.Future = self._futures.pop(key)
+                future.set_exception(error)
+                future.exception()
+            return
+
+        for key in keys:
+            self._futures[key].set_result(values.get(key))
+
+
+_loaders: ContextVar[Dict[str, DataLoader] | None] = ContextVar("dataloaders", default=None)
+
+
+def get_loader(name: str, batch_load: BatchLoad) -> DataLoader:
+    loaders: Dict[str, DataLoader] | None = _loaders.get()
+
+    if loaders == None:
+        return DataLoader(batch_load)
+
+    if name not in loaders:
+        loaders[name] = DataLoader(batch_load)
+
+    return loaders[name]
+
+
+class DataLoaderMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = _loaders.set({})
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _loaders.reset(token)
@@ -0,0 +1,78 @@
+import inspect
+import time
+
+from functools import wraps
+from typing import Any, Callable, TypeVar
+
+from prometheus_client import Histogram
+from pydantic import BaseModel
+
+from core.metrics import REPOSITORY_SECONDS, REPOSITORY_ROWS, SERVICE_SECONDS
+
+FuncT = TypeVar("FuncT", bound=Callable[..., Any])
+
+
+def _count_rows(result: Any) -> int | None:
+    if result == None:
+        return 0
+
+    if isinstance(result, (list, dict, set, tuple)):
+        return len(result)
+
+    if isinstance(result, BaseModel):
+        for field in ("items", "products"):
+            rows: Any = getattr(result, field, None)
+
+            if isinstance(rows, list):
+                return len(rows)
+
+        return 1
+
+    return None
+
+
+def _instrument(seconds: Histogram, rows: Histogram | None) -> Callable[[FuncT], FuncT]:
+    def decorator(func: FuncT) -> FuncT:
+        label: str = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+        observe_seconds = seconds.labels(label).observe
+        observe_rows = rows.labels(label).observe if rows != None else None
+
+        if inspect.isasyncgenfunction(func):
+            @wraps(func)
+            async def generator_wrapper(*args, **kwargs):
+                start: float = time.perf_counter()
+                total: int = 0
+
+                try:
+                    async for batch in func(*args, **kwargs):
+                        total += _count_rows(batch) or 0
+                        yield batch
+                finally:
+                    observe_seconds(time.perf_counter() - start)
+
+                    if observe_rows != None:
+                        observe_rows(total)
+
+            return generator_wrapper
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            start: float = time.perf_counter()
+
+            try:
+                result: Any = await func(*args, **kwargs)
+            finally:
+                observe_seconds(time.perf_counter() - start)
+
+            if observe_rows != None and (count := _count_rows(result)) != None:
+                observe_rows(count)
+
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+observe_repository = _instrument(REPOSITORY_SECONDS, REPOSITORY_ROWS)
+observe_service = _instrument(SERVICE_SECONDS, None)
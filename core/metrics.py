@@ -0,0 +1,52 @@
+from prometheus_client import Counter, Histogram
+
+CACHE_HITS = Counter(
+    "stock_api_cache_hits_total",
+    "Number of lookups answered from an in-process cache",
+    ["cache"]
+)
+CACHE_MISSES = Counter(
+    "stock_api_cache_misses_total",
+    "Number of lookups that missed an in-process cache",
+    ["cache"]
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    "stock_api_password_hash_seconds",
+    "Time spent hashing or verifying a password with bcrypt",
+    ["operation"],
+    buckets=(0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.5)
+)
+UPLOAD_BYTES = Counter(
+    "stock_api_upload_bytes_total",
+    "Bytes written to storage by file uploads",
+    ["path"]
+)
+UPLOAD_DEDUPLICATED = Counter(
+    "stock_api_upload_deduplicated_total",
+    "Uploads whose content was already stored and were not written again",
+    ["path"]
+)
+UPLOAD_SECONDS = Histogram(
+    "stock_api_upload_seconds",
+    "Time spent streaming an upload to storage",
+    ["path"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+REPOSITORY_SECONDS = Histogram(
+    "stock_api_repository_seconds",
+    "Time spent in a repository function, including the database round trip",
+    ["function"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+REPOSITORY_ROWS = Histogram(
+    "stock_api_repository_rows",
+    "Rows returned by a repository function",
+    ["function"],
+    buckets=(0, 1, 5, 10, 20, 50, 100, 500, 1000, 5000)
+)
+SERVICE_SECONDS = Histogram(
+    "stock_api_service_seconds",
+    "Time spent in a service function, including cache lookups and DTO construction",
+    ["function"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
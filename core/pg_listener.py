@@ -0,0 +1,104 @@
+import logging
+import select
+import threading
+
+from typing import Callable, List, Set, Tuple
+from urllib.parse import urlencode, urlsplit, urlunsplit, parse_qsl
+
+import psycopg2
+import psycopg2.extensions
+
+logger = logging.getLogger(__name__)
+
+
+# query parameters understood by the Prisma engine but rejected by libpq
+PRISMA_ONLY_PARAMS: Set[str] = {
+    "schema",
+    "connection_limit",
+    "pool_timeout",
+    "socket_timeout",
+    "pgbouncer",
+    "statement_cache_size",
+    "sslidentity",
+    "sslpassword",
+    "sslaccept",
+    "max_connection_lifetime",
+    "max_idle_connection_lifetime"
+}
+
+
+def listener_dsn(database_url: str) -> str:
+    scheme, netloc, path, query, fragment = urlsplit(database_url)
+    params: List[Tuple[str, str]] = [
+        (name, value) for name, value in parse_qsl(query) if name not in PRISMA_ONLY_PARAMS
+    ]
+
+    return urlunsplit((scheme, netloc, path, urlencode(params), fragment))
+
+
+class PostgresListener:
+    def __init__(
+        self,
+        dsn: str,
+        channel: str,
+        on_notify: Callable[[str], None],
+        on_reconnect: Callable[[], None],
+        poll_interval: float = 1.0,
+        retry_interval: float = 5.0
+    ) -> None:
+        self.dsn = dsn
+        self.channel = channel
+        self.on_notify = on_notify
+        self.on_reconnect = on_reconnect
+        self.poll_interval = poll_interval
+        self.retry_interval = retry_interval
+        self._stopped: threading.Event = threading.Event()
+        self._thread: threading.Thread = threading.Thread(
+            target=self._run,
+            name=f"listen-{channel}",
+            daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join(timeout=self.poll_interval * 2)
+
+    def _listen(self, connection: psycopg2.extensions.connection) -> None:
+        while not self._stopped.is_set():
+            if select.select([connection], [], [], self.poll_interval) == ([], [], []):
+                continue
+
+            connection.poll()
+
+            while connection.notifies:
+                self.on_notify(connection.notifies.pop(0).payload)
+
+    def _run(self) -> None:
+        connected_before: bool = False
+
+        while not self._stopped.is_set():
+            try:
+                connection = psycopg2.connect(self.dsn)
+            except psycopg2.Error:
+                logger.warning("LISTEN %s: connection failed, retrying", self.channel, exc_info=True)
+                self._stopped.wait(self.retry_interval)
+                continue
+
+            try:
+                connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                connection.cursor().execute(f'LISTEN "{self.channel}"')
+
+                # notifications sent while disconnected are lost, resync everything
+                if connected_before:
+                    self.on_reconnect()
+
+                connected_before = True
+                self._listen(connection)
+            except psycopg2.Error:
+                logger.warning("LISTEN %s: connection lost, reconnecting", self.channel, exc_info=True)
+                self._stopped.wait(self.retry_interval)
+            finally:
+                connection.close()
@@ -1,6 +1,110 @@
+import asyncio
+
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import AsyncIterator
+from urllib.parse import urlencode, urlsplit, urlunsplit, parse_qsl
+
+from fastapi import FastAPI
 from prisma import Prisma
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from core.config import (
+    DATABASE_URL,
+    DATABASE_CONNECTION_LIMIT,
+    DATABASE_POOL_TIMEOUT,
+    DATABASE_CONNECT_TIMEOUT,
+    DATABASE_SHUTDOWN_TIMEOUT,
+    PRISMA_METRICS_INTERVAL,
+    STORAGE_LOCK_TIMEOUT
+)
+from core.prisma_metrics import poll_prisma_metrics
+
+
+def _datasource_url() -> str:
+    scheme, netloc, path, query, fragment = urlsplit(DATABASE_URL)
+    params: dict = dict(parse_qsl(query))
+
+    params["connection_limit"] = str(DATABASE_CONNECTION_LIMIT)
+    params["pool_timeout"] = str(DATABASE_POOL_TIMEOUT)
+
+    return urlunsplit((scheme, netloc, path, urlencode(params), fragment))
+
+
+prisma_db: Prisma = Prisma(
+    datasource={"url": _datasource_url()},
+    connect_timeout=timedelta(seconds=DATABASE_CONNECT_TIMEOUT)
+)
+
+_in_flight: int = 0
+_drained: asyncio.Event = asyncio.Event()
+_drained.set()
+
+
+ADVISORY_LOCK: str = "SELECT 1 AS locked FROM pg_advisory_xact_lock(hashtext($1))"
 
 
 async def prisma_connection() -> Prisma:
-    prisma_db: Prisma = Prisma()
     return prisma_db
+
+
+@asynccontextmanager
+async def locked_transaction(key: str) -> AsyncIterator[Prisma]:
+    # serializes work on the same key across workers, the lock is released with the transaction
+    async with prisma_db.tx(timeout=timedelta(seconds=STORAGE_LOCK_TIMEOUT)) as transaction:
+        await transaction.query_raw(ADVISORY_LOCK, key)
+        yield transaction
+
+
+class InFlightMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        global _in_flight
+
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        _in_flight += 1
+        _drained.clear()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _in_flight -= 1
+
+            if _in_flight == 0:
+                _drained.set()
+
+
+async def connect() -> None:
+    if not prisma_db.is_connected():
+        await prisma_db.connect()
+
+
+async def disconnect() -> None:
+    try:
+        await asyncio.wait_for(_drained.wait(), timeout=DATABASE_SHUTDOWN_TIMEOUT)
+    except asyncio.TimeoutError:
+        pass
+
+    if prisma_db.is_connected():
+        await prisma_db.disconnect(timeout=timedelta(seconds=DATABASE_SHUTDOWN_TIMEOUT))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    await connect()
+    poller: asyncio.Task | None = None
+
+    if PRISMA_METRICS_INTERVAL > 0:
+        poller = asyncio.create_task(poll_prisma_metrics(prisma_db, PRISMA_METRICS_INTERVAL))
+
+    yield
+
+    if poller != None:
+        poller.cancel()
+
+    await disconnect()
@@ -0,0 +1,71 @@
+import asyncio
+import logging
+
+from typing import Iterator, List, Tuple
+
+from prisma import Prisma, Metrics
+from prometheus_client.core import (
+    CounterMetricFamily,
+    GaugeMetricFamily,
+    HistogramMetricFamily,
+    Metric
+)
+from prometheus_client.registry import REGISTRY, Collector
+
+logger = logging.getLogger(__name__)
+
+
+class PrismaMetricsCollector(Collector):
+    def __init__(self) -> None:
+        self.snapshot: Metrics | None = None
+
+    def collect(self) -> Iterator[Metric]:
+        if self.snapshot == None:
+            return
+
+        for counter in self.snapshot.counters:
+            family = CounterMetricFamily(
+                counter.key.removesuffix("_total"),
+                counter.description,
+                labels=list(counter.labels)
+            )
+            family.add_metric(list(counter.labels.values()), counter.value)
+            yield family
+
+        for gauge in self.snapshot.gauges:
+            family = GaugeMetricFamily(gauge.key, gauge.description, labels=list(gauge.labels))
+            family.add_metric(list(gauge.labels.values()), gauge.value)
+            yield family
+
+        for histogram in self.snapshot.histograms:
+            buckets: List[Tuple[str, float]] = []
+            cumulative: int = 0
+
+            for max_value, count in histogram.value.buckets:
+                cumulative += count
+                buckets.append((str(float(max_value)), cumulative))
+
+            buckets.append(("+Inf", histogram.value.count))
+
+            family = HistogramMetricFamily(
+                histogram.key.removesuffix("_histogram_ms") + "_ms",
+                histogram.description,
+                labels=list(histogram.labels)
+            )
+            family.add_metric(list(histogram.labels.values()), buckets, histogram.value.sum)
+            yield family
+
+
+prisma_metrics_collector: PrismaMetricsCollector = PrismaMetricsCollector()
+REGISTRY.register(prisma_metrics_collector)
+
+
+async def poll_prisma_metrics(client: Prisma, interval: float) -> None:
+    while True:
+        try:
+            prisma_metrics_collector.snapshot = await client.get_metrics()
+        except Exception:
+            logger.warning("Prisma metrics unavailable, stopping the poller", exc_info=True)
+            return
+
+        await asyncio.sleep(interval)
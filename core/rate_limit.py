@@ -0,0 +1,27 @@
+from fastapi import Request
+
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+
+from core.authentication.token_service import token_service
+from core.config import RATE_LIMIT_STORAGE_URI, RATE_LIMIT_STRATEGY
+
+
+def rate_limit_key(request: Request) -> str:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+
+    if scheme.lower() == "bearer" and token != "":
+        payload: dict | None = token_service.verify(token)
+
+        if payload != None and payload.get("sub") != None:
+            return f"user:{payload['sub']}"
+
+    return f"ip:{get_remote_address(request)}"
+
+
+limiter: Limiter = Limiter(
+    key_func=rate_limit_key,
+    storage_uri=RATE_LIMIT_STORAGE_URI,
+    strategy=RATE_LIMIT_STRATEGY,
+    in_memory_fallback_enabled=RATE_LIMIT_STORAGE_URI != "memory://"
+)
@@ -1,21 +1,42 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from anyio import to_thread
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
+from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
-from core.config import API_HOST, API_PORT, API_VERSION
+from core.config import API_HOST, API_PORT, API_VERSION, CATEGORY_LISTEN_ENABLED
+from core.dataloader import DataLoaderMiddleware
+from core.prisma_connection import lifespan, InFlightMiddleware
+from core.rate_limit import limiter
 from api.api import api_router
+from api.utils.category_cache import listen_categories
 from prometheus_fastapi_instrumentator import Instrumentator
 
+
+@asynccontextmanager
+async def app_lifespan(app: FastAPI) -> AsyncIterator[None]:
+    async with lifespan(app):
+        # without the listener the process-wide category map is never filled,
+        # category reads go through the versioned cache instead
+        listener = await listen_categories() if CATEGORY_LISTEN_ENABLED else None
+
+        yield
+
+        if listener != None:
+            await to_thread.run_sync(listener.stop)
+
+
 origins = [
     "http://127.0.0.1:" + str(API_PORT),
     "http://localhost:" + str(API_PORT),
 ]
 
-limiter = Limiter(key_func=get_remote_address)
-
 app = FastAPI(
     title="Stock API - API with Prisma",
     description="Resources to CRUD by categories and products",
@@ -30,7 +51,9 @@ app = FastAPI(
     license_info={
         "name": "Apache 2.0",
         "url": "https://www.apache.org/licenses/LICENSE-2.0.html",
-    }
+    },
+    default_response_class=ORJSONResponse,
+    lifespan=app_lifespan
 )
 
 app.state.limiter = limiter
@@ -44,6 +67,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(InFlightMiddleware)
+app.add_middleware(DataLoaderMiddleware)
+
 app.include_router(api_router, prefix="/api/" + API_VERSION)
 
 Instrumentator().instrument(app).expose(app)
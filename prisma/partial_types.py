@@ -0,0 +1,16 @@
+from prisma.models import Category, Product
+
+Product.create_partial(
+    "ProductInCategory",
+    include={"id", "name", "description", "banner", "createdAt", "updateAt"}
+)
+
+Product.create_partial(
+    "ProductBanner",
+    include={"id", "banner"}
+)
+
+Category.create_partial(
+    "CategorySummary",
+    include={"id", "name", "productCount"}
+)
@@ -0,0 +1,18 @@
+-- Sends the id of every created, renamed or deleted category on the
+-- "categories_changed" channel, so each API worker refreshes its in-memory
+-- category map. Product count updates do not touch "name" and stay silent.
+-- Apply after `prisma db push`:
+--   prisma db execute --file prisma/sql/category_notify.sql --schema prisma/schema.prisma
+
+CREATE OR REPLACE FUNCTION categories_notify_change() RETURNS trigger AS $$
+BEGIN
+  PERFORM pg_notify('categories_changed', coalesce(NEW."id", OLD."id"));
+  RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS categories_notify_trigger ON "categories";
+
+CREATE TRIGGER categories_notify_trigger
+  AFTER INSERT OR DELETE OR UPDATE OF "name" ON "categories"
+  FOR EACH ROW EXECUTE FUNCTION categories_notify_change();
@@ -0,0 +1,14 @@
+-- Backfills categories."productCount" for rows created before the column existed.
+-- The API keeps it up to date afterwards, in the same transaction as each product write.
+-- Apply after `prisma db push`:
+--   prisma db execute --file prisma/sql/category_product_count.sql --schema prisma/schema.prisma
+
+UPDATE "categories" AS c
+SET "productCount" = counts.total
+FROM (
+  SELECT c2."id", count(p."id") AS total
+  FROM "categories" c2
+  LEFT JOIN "products" p ON p."categoryId" = c2."id"
+  GROUP BY c2."id"
+) AS counts
+WHERE counts."id" = c."id" AND c."productCount" <> counts.total;
@@ -0,0 +1,26 @@
+-- Keeps products."searchVector" in sync with name and description.
+-- Apply after `prisma db push`:
+--   prisma db execute --file prisma/sql/product_search.sql --schema prisma/schema.prisma
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE OR REPLACE FUNCTION products_search_vector_update() RETURNS trigger AS $$
+BEGIN
+  NEW."searchVector" :=
+    setweight(to_tsvector('simple', coalesce(NEW."name", '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(NEW."description", '')), 'B');
+  RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS products_search_vector_trigger ON "products";
+
+CREATE TRIGGER products_search_vector_trigger
+  BEFORE INSERT OR UPDATE OF "name", "description" ON "products"
+  FOR EACH ROW EXECUTE FUNCTION products_search_vector_update();
+
+UPDATE "products"
+SET "searchVector" =
+  setweight(to_tsvector('simple', coalesce("name", '')), 'A') ||
+  setweight(to_tsvector('simple', coalesce("description", '')), 'B')
+WHERE "searchVector" IS NULL;